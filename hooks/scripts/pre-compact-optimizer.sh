@@ -1,15 +1,19 @@
 #!/bin/bash
 # Pre-Compact Optimizer
-# Provides optimization hints before compaction
+# Records a structured compaction event before compaction
 # Note: The main optimization is done via the prompt hook in hooks.json
 
 PLUGIN_ROOT="${CLAUDE_PLUGIN_ROOT:-$(dirname "$(dirname "$(dirname "$0")")")}"
+METRICS_SCRIPT="$PLUGIN_ROOT/scripts/metrics-tracker.py"
 
-# Log compaction event for analytics (future use)
-ANALYTICS_DIR="$PLUGIN_ROOT/data/analytics"
-mkdir -p "$ANALYTICS_DIR"
+# Read the hook input (trigger, custom_instructions) from stdin
+input=$(cat)
 
-echo "$(date -Iseconds): PreCompact triggered" >> "$ANALYTICS_DIR/compaction.log"
+# Record context size before compaction; the tracker measures the
+# post-compaction size over the next few tool calls
+if [ -f "$METRICS_SCRIPT" ]; then
+    echo "$input" | python3 "$METRICS_SCRIPT" compaction 2>/dev/null
+fi
 
 # Output nothing - let the prompt hook handle the guidance
 exit 0
@@ -13,7 +13,7 @@ mkdir -p "$CHECKPOINT_DIR"
 
 # Record session to analytics
 if [ -f "$METRICS_SCRIPT" ] && [ -f "$ANALYTICS_SCRIPT" ]; then
-    python3 "$METRICS_SCRIPT" export 2>/dev/null | python3 "$ANALYTICS_SCRIPT" record 2>/dev/null
+    python3 "$ANALYTICS_SCRIPT" record --from-metrics 2>/dev/null
 fi
 
 # Calculate session duration
@@ -32,7 +32,8 @@ if [ "$DURATION_MINS" -gt 30 ]; then
     AUTO_CHECKPOINT="$CHECKPOINT_DIR/auto-$(date +%Y%m%d-%H%M%S).json"
 
     # Get health score from metrics
-    HEALTH_SCORE=$(python3 "$METRICS_SCRIPT" export 2>/dev/null | python3 -c "import sys,json; d=json.load(sys.stdin); print(d.get('health_score', 100))" 2>/dev/null || echo 100)
+    HEALTH_SCORE=$(python3 "$METRICS_SCRIPT" export --format ndjson --fields health_score 2>/dev/null | head -n 1 | sed -n 's/.*"health_score": *\([0-9]*\).*/\1/p')
+    HEALTH_SCORE=${HEALTH_SCORE:-100}
 
     cat > "$AUTO_CHECKPOINT" << EOF
 {
@@ -35,5 +35,5 @@ fi
 # Record session start time
 echo "$(date -Iseconds)" > "$PLUGIN_ROOT/data/.session_start"
 
-# Initialize metrics for new session
+# Initialize metrics for new session (the hook input on stdin carries the session id)
 python3 "$PLUGIN_ROOT/scripts/metrics-tracker.py" init 2>/dev/null || true
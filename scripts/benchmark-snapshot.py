@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark the binary metrics snapshot against the JSON format.
+
+Usage:
+    python3 benchmark-snapshot.py [--repeat N]
+
+Builds tracker state for sessions of 100 and 1,000 files (exact mode)
+and 10k and 100k files (bounded mode, where state is mostly sketches and
+read fingerprints), then reports save+load time per round trip, load
+plus duration time (what every hook process pays), and file size for
+both formats. Runs in a temporary directory and never touches plugin data.
+"""
+
+import hashlib
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from session_memory import snapshot, tracker
+
+SIZES = (100, 1_000, 10_000, 100_000)
+
+
+def build_metrics(n_files):
+    """Build the metrics a session reading n_files distinct files would hold."""
+    metrics = tracker.get_default_metrics()
+    metrics["session_id"] = "bench001"
+    m = metrics["metrics"]
+    sk = None
+    for i in range(n_files):
+        path = f"/home/user/project/src/module_{i // 50}/file_{i}.py"
+        m["total_tool_calls"] += 1
+        m["tool_invocations"]["Read"] = m["tool_invocations"].get("Read", 0) + 1
+        tracker.track_file(m, "read", path, sk)
+        if i % 4 == 0:
+            tracker.track_file(m, "written", path, sk)
+        if sk is None and n_files > tracker.BOUNDED_FILE_THRESHOLD and i > tracker.BOUNDED_FILE_THRESHOLD:
+            tracker.switch_to_bounded(m)
+            sk = tracker.open_sketches(m)
+    if sk is not None:
+        tracker.store_sketches(m, sk)
+
+    # Fingerprints survive only for the files bounded mode keeps exact
+    for path in m["files_read"][-tracker.TOP_K_FILES:]:
+        m.setdefault("read_fingerprints", {})[path] = {
+            "reads": 3, "redundant_reads": 1, "wasted_tokens": 800,
+            "hash": hashlib.blake2b(path.encode(), digest_size=16).hexdigest(),
+            "mtime_ns": 1_700_000_000_000_000_000, "size": 3200, "range": [None, None],
+        }
+    metrics["compaction_events"] = [{
+        "at": datetime.now().isoformat(), "trigger": "auto", "strategy": "auto",
+        "instructions": "", "measured": True, "tokens_before": 150_000,
+        "working_set_before": 300, "calls_observed": 5, "tokens_after": 30_000,
+        "working_set_after": 4, "tokens_reclaimed": 120_000, "retained_ratio": 0.2,
+    }]
+    metrics["health_score"] = tracker.calculate_health_score(metrics)
+    return metrics
+
+
+def json_round_trip(metrics, path):
+    with open(path, "w") as f:
+        json.dump(metrics, f, indent=2)
+    with open(path) as f:
+        return json.load(f)
+
+
+def binary_round_trip(metrics, path):
+    snapshot.dump(metrics, path)
+    return snapshot.load(path)
+
+
+def json_load_duration(path):
+    with open(path) as f:
+        return tracker.get_duration_minutes(json.load(f))
+
+
+def binary_load_duration(path):
+    return tracker.get_duration_minutes(snapshot.load(path))
+
+
+def best_of(fn, repeat, *args):
+    """Return the fastest of `repeat` calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        # Each hook runs in a fresh process, so the parse cache starts cold
+        tracker.parse_iso.cache_clear()
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    repeat = 5
+    if "--repeat" in sys.argv:
+        repeat = int(sys.argv[sys.argv.index("--repeat") + 1])
+
+    print("METRICS SNAPSHOT BENCHMARK")
+    print("=" * 86)
+    print(f"{'files':>8} {'mode':>8}  {'json ms':>8}  {'binary ms':>9}  {'json load':>9}  "
+          f"{'bin load':>8}  {'json KB':>8}  {'binary KB':>9}  {'size':>5}")
+    print("-" * 86)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "metrics.json"
+        bin_path = Path(tmp) / "metrics.bin"
+        for n in SIZES:
+            metrics = build_metrics(n)
+            if binary_round_trip(metrics, bin_path) != json_round_trip(metrics, json_path):
+                print(f"Round-trip mismatch at {n} files", file=sys.stderr)
+                sys.exit(1)
+            json_ms = best_of(json_round_trip, repeat, metrics, json_path)
+            bin_ms = best_of(binary_round_trip, repeat, metrics, bin_path)
+            json_load_ms = best_of(json_load_duration, repeat, json_path)
+            bin_load_ms = best_of(binary_load_duration, repeat, bin_path)
+            json_kb = json_path.stat().st_size / 1024
+            bin_kb = bin_path.stat().st_size / 1024
+            mode = metrics["metrics"].get("tracking_mode", "exact")
+            print(f"{n:>8} {mode:>8}  {json_ms:>8.2f}  {bin_ms:>9.2f}  {json_load_ms:>9.2f}  "
+                  f"{bin_load_ms:>8.2f}  {json_kb:>8.1f}  {bin_kb:>9.1f}  {bin_kb / json_kb:>5.0%}")
+
+
+if __name__ == "__main__":
+    main()
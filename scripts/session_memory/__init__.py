@@ -0,0 +1,40 @@
+"""
+In-process API for session-memory-optimizer.
+
+The CLI scripts in scripts/ are thin wrappers around these modules. Tools
+that embed the tracker can use the store objects directly and skip the
+per-call process startup and file parsing:
+
+    import sys
+    sys.path.insert(0, "<plugin root>/scripts")
+    from session_memory import SessionTracker, CheckpointStore
+
+    tracker = SessionTracker()
+    tracker.record_many([("Read", {"tool_input": {"file_path": "app.py"}})])
+    CheckpointStore().save_with_metrics("milestone", {"summary": "..."}, tracker)
+"""
+
+import importlib
+
+__all__ = ["AnalyticsStore", "CheckpointStore", "SessionTracker"]
+
+# Classes are imported on first access so that hook processes, which only
+# need the tracker, never pay for the analytics and checkpoint modules
+_EXPORTS = {
+    "AnalyticsStore": ".analytics",
+    "CheckpointStore": ".checkpoints",
+    "SessionTracker": ".tracker",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,604 @@
+"""
+Analytics store for Session Memory Optimizer
+
+Tracks historical session data for pattern analysis and recommendations.
+Keeps last 30 days of session summaries.
+
+Usage (via analytics-manager.py):
+    python3 analytics-manager.py dashboard
+    python3 analytics-manager.py record [--from-metrics]
+    python3 analytics-manager.py export [--format ndjson ...]
+    python3 analytics-manager.py trends
+    python3 analytics-manager.py backfill [path ...] [--workers N]
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from . import export_stream, tracker
+from .paths import get_data_dir
+
+# Tools matched by the PostToolUse hook in hooks.json
+TRACKED_TOOLS = ("Read", "Write", "Edit", "Bash", "Grep", "Glob")
+RETENTION_DAYS = 30
+BACKFILL_BATCH_SIZE = 50
+
+
+def get_default_analytics():
+    """Return an empty analytics document."""
+    return {
+        "sessions": [],
+        "aggregates": {
+            "total_sessions": 0,
+            "avg_duration_minutes": 0,
+            "avg_health_score": 0,
+            "avg_tool_calls": 0,
+            "avg_files_read": 0
+        },
+        "last_updated": None
+    }
+
+
+def prune_old_sessions(data, days=30):
+    """Remove sessions older than specified days."""
+    cutoff = datetime.now() - timedelta(days=days)
+    data["sessions"] = [
+        s for s in data["sessions"]
+        if datetime.fromisoformat(s.get("ended_at", s.get("started_at", datetime.now().isoformat()))) > cutoff
+    ]
+    return data
+
+
+def calculate_aggregates(data):
+    """Calculate aggregate statistics from session history."""
+    sessions = data["sessions"]
+    if not sessions:
+        data["aggregates"] = {
+            "total_sessions": 0,
+            "avg_duration_minutes": 0,
+            "avg_health_score": 0,
+            "avg_tool_calls": 0,
+            "avg_files_read": 0,
+            "avg_tokens_reclaimed_per_compaction": 0,
+            "avg_retained_ratio": None,
+            "compaction_strategies": {}
+        }
+        return data
+
+    total = len(sessions)
+    durations = [s.get("duration_minutes", 0) for s in sessions]
+    health_scores = [s.get("final_health_score", 100) for s in sessions]
+    tool_calls = [s.get("total_tool_calls", 0) for s in sessions]
+    files_read = [s.get("files_read_count", 0) for s in sessions]
+
+    compactions_measured = sum(s.get("compactions_measured", 0) for s in sessions)
+    tokens_reclaimed = sum(s.get("tokens_reclaimed", 0) for s in sessions)
+    tokens_before = sum(s.get("compaction_tokens_before", 0) for s in sessions)
+    strategies = {}
+    for s in sessions:
+        for name, entry in s.get("compaction_strategies", {}).items():
+            if not entry.get("tokens_before"):
+                # Recorded before compactions were measured from real usage
+                continue
+            agg = strategies.setdefault(name, {"count": 0, "tokens_before": 0, "tokens_reclaimed": 0})
+            agg["count"] += entry.get("count", 0)
+            agg["tokens_before"] += entry["tokens_before"]
+            agg["tokens_reclaimed"] += entry.get("tokens_reclaimed", 0)
+    for agg in strategies.values():
+        agg["avg_tokens_reclaimed"] = round(agg["tokens_reclaimed"] / agg["count"], 1) if agg["count"] else 0
+        # Share of the context still in use after compaction; lower means more was freed
+        agg["retained_ratio"] = round(1 - agg["tokens_reclaimed"] / agg["tokens_before"], 3)
+
+    data["aggregates"] = {
+        "total_sessions": total,
+        "avg_duration_minutes": round(sum(durations) / total, 1) if total else 0,
+        "avg_health_score": round(sum(health_scores) / total, 1) if total else 0,
+        "avg_tool_calls": round(sum(tool_calls) / total, 1) if total else 0,
+        "avg_files_read": round(sum(files_read) / total, 1) if total else 0,
+        "avg_tokens_reclaimed_per_compaction": (
+            round(tokens_reclaimed / compactions_measured, 1) if compactions_measured else 0
+        ),
+        "avg_retained_ratio": round(1 - tokens_reclaimed / tokens_before, 3) if tokens_before else None,
+        "compaction_strategies": strategies
+    }
+    return data
+
+
+def summarize_records(records, ended_at=None):
+    """
+    Build a session summary from an export record stream.
+
+    This is the single place summaries are built; live recording, stdin
+    recording and backfill all go through it. Only the leading session
+    header is consumed, so per-file records are never materialized.
+    """
+    for record in records:
+        if record.get("type") != "session":
+            continue
+        return {
+            "session_id": record.get("session_id", "unknown"),
+            "started_at": record.get("started_at"),
+            "ended_at": (ended_at or datetime.now()).isoformat(),
+            "duration_minutes": record.get("duration_minutes", 0),
+            "final_health_score": record.get("health_score", 100),
+            "total_tool_calls": record.get("total_tool_calls", 0),
+            "files_read_count": record.get("files_read_count", 0),
+            "checkpoints_created": record.get("checkpoints_created", 0),
+            "compactions": record.get("compactions_triggered", 0),
+            "redundant_reads": record.get("redundant_reads", 0),
+            "wasted_tokens": record.get("wasted_tokens", 0),
+            "compactions_measured": record.get("compactions_measured", 0),
+            "compaction_tokens_before": record.get("compaction_tokens_before", 0),
+            "tokens_reclaimed": record.get("tokens_reclaimed", 0),
+            "compaction_strategies": record.get("compaction_strategies", {})
+        }
+    return None
+
+
+def summarize_metrics(metrics, ended_at=None):
+    """Build a session summary from a metrics document."""
+    return summarize_records(export_stream.iter_metrics_records(metrics, ended_at), ended_at)
+
+
+# === Backfill from historical transcripts ===
+
+def get_default_transcript_dir():
+    """Get the directory Claude Code writes session transcripts to."""
+    return Path.home() / ".claude" / "projects"
+
+
+def iter_transcript_tool_calls(path):
+    """
+    Yield (timestamp, session_id, tool_name, tool_input, context_usage) from a transcript.
+
+    Reads line by line. Accepts both hook-style records
+    ({"tool_name", "tool_input"}) and transcript messages whose content
+    holds tool_use blocks. Compaction boundaries are yielded with the
+    tool name "PreCompact" and their compaction metadata as input.
+    Sidechain (subagent) entries are skipped: they carry the parent's
+    session id but never entered the parent's context.
+    ``context_usage`` is the real context size when the transcript records
+    it: the message's API usage for tool calls, preTokens for compactions.
+    """
+    with open(path, errors="replace") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(entry, dict) or entry.get("isSidechain"):
+                continue
+
+            ts = entry.get("timestamp")
+            session_id = entry.get("sessionId") or entry.get("session_id")
+
+            if entry.get("subtype") == "compact_boundary":
+                metadata = entry.get("compactMetadata") or {}
+                pre_tokens = metadata.get("preTokens") if isinstance(metadata, dict) else None
+                yield ts, session_id, "PreCompact", metadata, pre_tokens or None
+                continue
+
+            if "tool_name" in entry:
+                yield ts, session_id, entry["tool_name"], entry.get("tool_input") or {}, None
+                continue
+
+            message = entry.get("message") or {}
+            content = message.get("content") if isinstance(message, dict) else None
+            if not isinstance(content, list):
+                continue
+            usage = tracker.usage_tokens(message.get("usage"))
+            for block in content:
+                if isinstance(block, dict) and block.get("type") == "tool_use":
+                    yield ts, session_id, block.get("name", "Unknown"), block.get("input") or {}, usage
+
+
+def replay_transcript(path):
+    """
+    Replay one transcript through the tracker and return a session summary.
+
+    Runs in a worker process. Returns None if the transcript holds no
+    tracked tool calls. Bounded-mode sketches stay open for the whole
+    replay and are stored once at the end.
+    """
+    metrics = sk = None
+    first_ts = last_ts = None
+
+    for ts, session_id, tool_name, tool_input, usage in iter_transcript_tool_calls(path):
+        if tool_name not in TRACKED_TOOLS and tool_name != "PreCompact":
+            continue
+        if not isinstance(tool_input, dict) or not isinstance(tool_input.get("file_path", ""), str):
+            # Malformed entry; the tracker expects an input object with a path string
+            continue
+        when = export_stream.parse_timestamp(ts)
+        if when:
+            first_ts = first_ts or when
+            last_ts = when
+        if metrics is None:
+            metrics = tracker.get_default_metrics()
+            metrics["session_id"] = (session_id or Path(path).stem)[:8]
+        if tool_name == "PreCompact":
+            tracker.record_compaction(metrics, tool_input, when, context_usage=usage, sk=sk)
+        else:
+            sk = tracker.apply_tool(metrics, tool_name, {"tool_input": tool_input}, sk,
+                                    hash_content=False, context_usage=usage)
+
+    if metrics is None:
+        return None
+    if sk is not None:
+        tracker.store_sketches(metrics["metrics"], sk)
+
+    first_ts = first_ts or datetime.fromtimestamp(Path(path).stat().st_mtime)
+    last_ts = last_ts or first_ts
+    metrics["started_at"] = first_ts.isoformat()
+    metrics["health_score"] = tracker.calculate_health_score(metrics, last_ts)
+
+    summary = summarize_metrics(metrics, last_ts)
+    summary["backfilled"] = True
+    return summary
+
+
+def find_transcripts(paths):
+    """Yield transcript files (*.jsonl) under the given files or directories."""
+    for p in paths:
+        p = Path(p).expanduser()
+        if p.is_dir():
+            yield from sorted(p.rglob("*.jsonl"))
+        elif p.is_file():
+            yield p
+
+
+class AnalyticsStore:
+    """
+    Session history in data/analytics.json.
+
+    The document is held in memory and reloaded only when another process
+    has rewritten it. record_many() inserts any number of sessions with a
+    single write.
+    """
+
+    def __init__(self, plugin_root=None):
+        self.plugin_root = plugin_root
+        self.data_dir = get_data_dir(plugin_root)
+        self.analytics_file = self.data_dir / "analytics.json"
+        self.backfill_state_file = self.data_dir / "analytics" / "backfill_state.json"
+        self._data = None
+        self._stamp = None
+
+    def _file_stamp(self):
+        try:
+            st = self.analytics_file.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    @property
+    def data(self):
+        """The analytics document (reloaded if changed on disk)."""
+        if self._data is None or self._file_stamp() != self._stamp:
+            self.reload()
+        return self._data
+
+    def reload(self):
+        """Load analytics data from file."""
+        self._stamp = self._file_stamp()
+        self._data = export_stream.load_json_file(self.analytics_file) or get_default_analytics()
+        return self._data
+
+    def save(self):
+        """Save the in-memory analytics data to file, even if the file changed since it was read."""
+        data = self._data if self._data is not None else self.reload()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        data["last_updated"] = datetime.now().isoformat()
+        with open(self.analytics_file, 'w') as f:
+            json.dump(data, f, indent=2)
+        self._stamp = self._file_stamp()
+
+    def record_summary(self, session_summary):
+        """Append a session summary (replacing any for the same session) and refresh aggregates."""
+        data = prune_old_sessions(self.data)
+        data["sessions"] = [s for s in data["sessions"] if s.get("session_id") != session_summary["session_id"]]
+        data["sessions"].append(session_summary)
+        calculate_aggregates(data)
+        self.save()
+        return session_summary
+
+    def record(self, session_data):
+        """Record a completed session from its metrics document."""
+        return self.record_summary(summarize_metrics(session_data))
+
+    def record_from_tracker(self, session_tracker=None):
+        """
+        Record the current session from a SessionTracker.
+
+        Without a tracker, the metrics file is streamed directly so only the
+        session header is built.
+        """
+        if session_tracker is None:
+            records = export_stream.iter_metrics_file(self.data_dir / "metrics.json")
+        else:
+            records = session_tracker.iter_records()
+        summary = summarize_records(records)
+        if summary is None:
+            return None
+        return self.record_summary(summary)
+
+    def record_many(self, summaries):
+        """
+        Insert many session summaries in one analytics write.
+
+        Summaries sharing a session id (re-imports, or several transcripts
+        of one session) collapse to the one covering the most tool calls,
+        stored ones included, so the result does not depend on batch order.
+        Returns the number of summaries kept.
+        """
+        data = self.data
+        stored = {s.get("session_id"): s for s in data["sessions"]}
+        incoming = {}
+        for summary in summaries:
+            sid = summary["session_id"]
+            best = incoming.get(sid) or stored.get(sid)
+            if best is None or summary.get("total_tool_calls", 0) >= best.get("total_tool_calls", 0):
+                incoming[sid] = summary
+        data["sessions"] = [s for s in data["sessions"] if s.get("session_id") not in incoming]
+        data["sessions"].extend(incoming.values())
+        data["sessions"].sort(
+            key=lambda s: export_stream.parse_timestamp(s.get("ended_at") or s.get("started_at")) or datetime.min
+        )
+        prune_old_sessions(data, RETENTION_DAYS)
+        calculate_aggregates(data)
+        self.save()
+        return len(incoming)
+
+    def trends(self):
+        """Analyze trends in session data."""
+        sessions = self.data["sessions"]
+
+        if len(sessions) < 2:
+            return None
+
+        # Compare recent sessions (last 5) to older ones
+        recent = sessions[-5:] if len(sessions) >= 5 else sessions[-len(sessions)//2:]
+        older = sessions[:-5] if len(sessions) >= 5 else sessions[:len(sessions)//2]
+
+        if not older:
+            return None
+
+        recent_avg_health = sum(s.get("final_health_score", 100) for s in recent) / len(recent)
+        older_avg_health = sum(s.get("final_health_score", 100) for s in older) / len(older)
+
+        recent_avg_duration = sum(s.get("duration_minutes", 0) for s in recent) / len(recent)
+        older_avg_duration = sum(s.get("duration_minutes", 0) for s in older) / len(older)
+
+        return {
+            "health_trend": "improving" if recent_avg_health > older_avg_health else "declining",
+            "health_change": round(recent_avg_health - older_avg_health, 1),
+            "duration_trend": "longer" if recent_avg_duration > older_avg_duration else "shorter",
+            "duration_change": round(recent_avg_duration - older_avg_duration, 1),
+            "recent_avg_health": round(recent_avg_health, 1),
+            "recent_avg_duration": round(recent_avg_duration, 1)
+        }
+
+    def iter_records(self):
+        """Yield one export record per recorded session."""
+        yield from export_stream.iter_session_records(self.data)
+
+    def load_backfill_state(self):
+        """Load backfill progress: transcript path -> {size, mtime, session_id}."""
+        return export_stream.load_json_file(self.backfill_state_file) or {"imported": {}}
+
+    def save_backfill_state(self, state):
+        """Persist backfill progress."""
+        self.backfill_state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.backfill_state_file, 'w') as f:
+            json.dump(state, f, indent=2)
+
+    def backfill(self, paths, workers=None):
+        """
+        Import historical transcripts into analytics using a process pool.
+
+        Transcripts already imported (same size and mtime) or older than the
+        retention window are skipped. Progress is checkpointed after every
+        batch so an interrupted run resumes where it stopped.
+        """
+        # Imported here so recording a session never loads multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        state = self.load_backfill_state()
+        imported = state.setdefault("imported", {})
+        cutoff = (datetime.now() - timedelta(days=RETENTION_DAYS)).timestamp()
+
+        pending = []
+        skipped = 0
+        for path in find_transcripts(paths):
+            st = path.stat()
+            prev = imported.get(str(path))
+            if st.st_mtime < cutoff or (
+                prev and prev.get("size") == st.st_size and prev.get("mtime") == st.st_mtime
+            ):
+                skipped += 1
+                continue
+            pending.append((path, st))
+
+        inserted = 0
+        batch, batch_files = [], {}
+
+        # Sessions recorded live carry more detail (checkpoints, redundant
+        # reads) than a replay can recover, so backfill never overwrites them
+        live = {s.get("session_id") for s in self.data["sessions"] if not s.get("backfilled")}
+
+        def flush():
+            nonlocal inserted, batch, batch_files
+            batch = [s for s in batch if s["session_id"] not in live]
+            if batch:
+                inserted += self.record_many(batch)
+            imported.update(batch_files)
+            self.save_backfill_state(state)
+            batch, batch_files = [], {}
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(replay_transcript, str(p)): (p, st) for p, st in pending}
+            for future in as_completed(futures):
+                path, st = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    # One bad transcript must not lose the rest of the run
+                    print(f"  Skipped {path}: {type(e).__name__}: {e}", file=sys.stderr)
+                    continue
+                batch_files[str(path)] = {
+                    "size": st.st_size,
+                    "mtime": st.st_mtime,
+                    "session_id": summary["session_id"] if summary else None
+                }
+                if summary:
+                    batch.append(summary)
+                if len(batch_files) >= BACKFILL_BATCH_SIZE:
+                    flush()
+        flush()
+
+        return {"scanned": len(pending) + skipped, "skipped": skipped,
+                "replayed": len(pending), "inserted": inserted}
+
+
+# === Commands ===
+
+def show_dashboard(store):
+    """Display analytics dashboard."""
+    data = store.data
+    # Recomputed so documents written by older versions show current fields
+    agg = calculate_aggregates(data)["aggregates"]
+    trends = store.trends()
+
+    print("SESSION ANALYTICS DASHBOARD")
+    print("=" * 40)
+    print()
+
+    print(f"Total Sessions Tracked: {agg['total_sessions']}")
+    print(f"Data Retention: Last 30 days")
+    print()
+
+    print("AVERAGES")
+    print("-" * 40)
+    print(f"  Duration:     {agg['avg_duration_minutes']:.0f} minutes")
+    print(f"  Health Score: {agg['avg_health_score']:.0f}/100")
+    print(f"  Tool Calls:   {agg['avg_tool_calls']:.0f}")
+    print(f"  Files Read:   {agg['avg_files_read']:.0f}")
+    print()
+
+    strategies = agg.get("compaction_strategies", {})
+    if strategies:
+        print("COMPACTION EFFECTIVENESS")
+        print("-" * 40)
+        print(f"  Avg Reclaimed: {agg.get('avg_tokens_reclaimed_per_compaction', 0):.0f} tokens/compaction, "
+              f"{agg['avg_retained_ratio']:.0%} of context kept")
+        ranked = sorted(strategies.items(), key=lambda x: x[1]["retained_ratio"])
+        for name, entry in ranked:
+            print(f"  {name}: keeps {entry['retained_ratio']:.0%} of context, "
+                  f"{entry['avg_tokens_reclaimed']:.0f} tokens reclaimed avg ({entry['count']} compactions)")
+        print()
+
+    if trends:
+        print("TRENDS (Recent vs Older)")
+        print("-" * 40)
+        health_arrow = "+" if trends["health_change"] > 0 else ""
+        duration_arrow = "+" if trends["duration_change"] > 0 else ""
+        print(f"  Health:   {trends['health_trend']} ({health_arrow}{trends['health_change']})")
+        print(f"  Duration: {trends['duration_trend']} ({duration_arrow}{trends['duration_change']} min)")
+        print()
+
+    # Show recent sessions
+    sessions = data["sessions"][-5:]
+    if sessions:
+        print("RECENT SESSIONS")
+        print("-" * 40)
+        for s in reversed(sessions):
+            started = s.get("started_at", "")[:10] if s.get("started_at") else "unknown"
+            health = s.get("final_health_score", "?")
+            duration = s.get("duration_minutes", 0)
+            print(f"  {started}: {duration:.0f}min, health={health}")
+
+    print()
+    if agg["avg_health_score"] < 60:
+        print("RECOMMENDATION: Consider using /session-checkpoint")
+        print("more frequently to preserve context.")
+
+
+def show_export(store, args=()):
+    """Export raw analytics data as JSON, or stream sessions as NDJSON."""
+    try:
+        opts = export_stream.parse_export_args(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if opts["format"] == "json":
+        print(json.dumps(store.data, indent=2))
+        return
+
+    export_stream.export_records(store.iter_records(), opts)
+
+
+def print_recorded(summary):
+    """Print a short confirmation for a recorded session."""
+    print(f"Session recorded: {summary['session_id']}")
+    print(f"  Duration: {summary['duration_minutes']:.0f} minutes")
+    print(f"  Health: {summary['final_health_score']}/100")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: analytics-manager.py <command>")
+        print("Commands: dashboard, record [--from-metrics], export [--format ndjson ...], trends, backfill")
+        sys.exit(1)
+
+    command = argv[0]
+    store = AnalyticsStore()
+
+    if command == "dashboard":
+        show_dashboard(store)
+    elif command == "record":
+        if "--from-metrics" in argv[1:]:
+            summary = store.record_from_tracker()
+            if summary is None:
+                print("Error: No session metrics to record", file=sys.stderr)
+                sys.exit(1)
+            print_recorded(summary)
+            return
+        # Read session data from stdin
+        try:
+            session_data = json.load(sys.stdin)
+            summary = store.record(session_data)
+            print_recorded(summary)
+        except json.JSONDecodeError:
+            print("Error: Invalid JSON input", file=sys.stderr)
+            sys.exit(1)
+    elif command == "export":
+        show_export(store, argv[1:])
+    elif command == "backfill":
+        args = list(argv[1:])
+        workers = None
+        if "--workers" in args:
+            i = args.index("--workers")
+            try:
+                workers = int(args[i + 1])
+            except (IndexError, ValueError):
+                print("Error: --workers requires an integer", file=sys.stderr)
+                sys.exit(1)
+            del args[i:i + 2]
+        paths = args or [get_default_transcript_dir()]
+        result = store.backfill(paths, workers)
+        print(f"Backfill complete: {result['inserted']} session(s) imported")
+        print(f"  Transcripts scanned: {result['scanned']}")
+        print(f"  Already imported or out of retention: {result['skipped']}")
+    elif command == "trends":
+        trends = store.trends()
+        if trends:
+            print(json.dumps(trends, indent=2))
+        else:
+            print("Not enough data for trend analysis")
+    else:
+        print(f"Unknown command: {command}", file=sys.stderr)
+        sys.exit(1)
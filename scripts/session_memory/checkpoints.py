@@ -0,0 +1,510 @@
+"""
+Checkpoint store for session-memory-optimizer plugin.
+
+CheckpointStore keeps the search index in memory across calls; the CLI
+in main() is what checkpoint-manager.py runs.
+"""
+
+import json
+import math
+import os
+import re
+import sys
+import zlib
+from collections import Counter
+from datetime import datetime
+
+from .paths import get_data_dir
+
+# Relevance weight of each searchable checkpoint field
+SEARCH_FIELDS = {
+    'current_task': 3.0,
+    'summary': 2.0,
+    'active_files': 2.0,
+    'decisions': 1.5,
+    'context_hints': 1.0,
+}
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'the', 'this', 'to', 'was', 'we', 'with',
+}
+INDEX_VERSION = 3
+# Postings are split across shard logs so a query only loads its terms' shards
+# and an update only appends to the shards its terms hash to
+INDEX_SHARDS = 256
+
+def tokenize(text: str):
+    """Split text into lowercase search terms (paths split on separators)."""
+    return [t for t in re.findall(r'[a-z0-9]+', text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+def checkpoint_terms(data: dict):
+    """Return weighted term frequencies for a checkpoint's searchable fields."""
+    terms = Counter()
+    for field, weight in SEARCH_FIELDS.items():
+        value = data.get(field)
+        if field == 'summary' and not value:
+            value = data.get('note')
+        if isinstance(value, list):
+            value = ' '.join(str(v) for v in value)
+        for term in tokenize(str(value or '')):
+            terms[term] += weight
+    return terms
+
+def term_shard(term: str):
+    """Return the shard number holding a term's postings."""
+    return zlib.crc32(term.encode('utf-8')) % INDEX_SHARDS
+
+class CheckpointStore:
+    """
+    Named checkpoints in data/checkpoints/ plus their search index.
+
+    The index's document table and postings shards stay in memory between
+    calls; they are reloaded only if another process rewrote the index.
+    """
+
+    def __init__(self, plugin_root=None):
+        data_dir = get_data_dir(plugin_root)
+        self.checkpoint_dir = data_dir / 'checkpoints'
+        # Kept outside checkpoints/ so globs over *.json skip it
+        self.index_dir = data_dir / 'checkpoint_index'
+        self._index = None
+        self._index_stamp = None
+
+    def path(self, name: str):
+        return self.checkpoint_dir / f"{name}.json"
+
+    # === Checkpoints ===
+
+    def list(self):
+        """List all available checkpoints, newest first."""
+        if not self.checkpoint_dir.exists():
+            return []
+
+        checkpoints = []
+        for f in sorted(self.checkpoint_dir.glob('*.json'), key=lambda x: x.stat().st_mtime, reverse=True):
+            try:
+                with open(f) as fp:
+                    data = json.load(fp)
+                    checkpoints.append({
+                        'name': f.stem,
+                        'timestamp': data.get('timestamp', 'unknown'),
+                        'summary': data.get('summary', data.get('note', ''))[:100],
+                        'path': str(f)
+                    })
+            except Exception as e:
+                checkpoints.append({
+                    'name': f.stem,
+                    'timestamp': 'error',
+                    'summary': f'Error reading: {e}',
+                    'path': str(f)
+                })
+
+        return checkpoints
+
+    def save(self, name: str, data: dict):
+        """Save a checkpoint and index it; returns its path."""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+        data['name'] = name
+        data['timestamp'] = datetime.now().isoformat()
+
+        checkpoint_path = self.path(name)
+        with open(checkpoint_path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+        self._add_to_index(name, data, checkpoint_path.stat().st_mtime_ns)
+        self._save_index()
+        return str(checkpoint_path)
+
+    def save_with_metrics(self, name: str, data: dict, tracker):
+        """
+        Save a checkpoint with a metrics snapshot and bump the checkpoint counter.
+
+        Both writes succeed or neither is visible: the checkpoint is staged in
+        a temporary file and only moved into place after the metrics are saved.
+        """
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+        data['name'] = name
+        data['timestamp'] = datetime.now().isoformat()
+        data['metrics_snapshot'] = tracker.snapshot()
+
+        checkpoint_path = self.path(name)
+        staged = self.checkpoint_dir / f".{name}.json.tmp"
+        created = tracker.metrics['metrics'].get('checkpoints_created', 0)
+        try:
+            with open(staged, 'w') as f:
+                json.dump(data, f, indent=2)
+            tracker.increment_checkpoint()
+            os.replace(staged, checkpoint_path)
+        except Exception:
+            staged.unlink(missing_ok=True)
+            m = tracker.metrics['metrics']
+            if m.get('checkpoints_created', 0) != created:
+                m['checkpoints_created'] = created
+                tracker.save()
+            raise
+
+        self._add_to_index(name, data, checkpoint_path.stat().st_mtime_ns)
+        self._save_index()
+        return str(checkpoint_path)
+
+    def load(self, name: str):
+        """Load a checkpoint by name, or None if it does not exist."""
+        checkpoint_path = self.path(name)
+        if not checkpoint_path.exists():
+            return None
+
+        with open(checkpoint_path) as f:
+            return json.load(f)
+
+    def delete(self, name: str):
+        """Delete a checkpoint by name; returns False if it did not exist."""
+        checkpoint_path = self.path(name)
+        if not checkpoint_path.exists():
+            return False
+
+        checkpoint_path.unlink()
+        self._remove_from_index(name)
+        self._save_index()
+        return True
+
+    def search(self, query: str, limit: int = 10):
+        """
+        Rank checkpoints by BM25 relevance to a query.
+
+        Works entirely from the index; checkpoint files are only read when
+        they are new or changed since the last index update.
+        """
+        if self._sync_index():
+            self._save_index()
+
+        docs = self._get_index()['docs']
+        if not docs:
+            return []
+        avg_length = sum(d['length'] for d in docs.values()) / len(docs) or 1
+        k1, b = 1.2, 0.75
+
+        scores = Counter()
+        for term in set(tokenize(query)):
+            postings = self._get_shard(term_shard(term)).get(term, {})
+            if not postings:
+                continue
+            idf = math.log(1 + (len(docs) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for name, tf in postings.items():
+                if name not in docs:
+                    continue
+                norm = k1 * (1 - b + b * docs[name]['length'] / avg_length)
+                scores[name] += idf * tf * (k1 + 1) / (tf + norm)
+
+        return [
+            {
+                'name': name,
+                'score': round(score, 3),
+                'timestamp': docs[name]['timestamp'],
+                'summary': docs[name]['summary'],
+            }
+            for name, score in scores.most_common(limit)
+        ]
+
+    # === Search index ===
+    #
+    # The index is a set of append-only logs in index_dir. docs.log holds one
+    # JSON line per checkpoint update ({"name", "doc"}, with "doc": null for
+    # a removal) after a {"version"} header. Each postings-NNN.log holds
+    # [name, {term: tf}] lines for the terms hashed to that shard, or
+    # [name, null] when the checkpoint no longer has terms there. The last
+    # line for a name wins. Saving or deleting a checkpoint appends a line to
+    # docs.log and to each shard its old or new terms touch, and nothing is
+    # rewritten. A log is compacted when it is loaded and mostly superseded lines.
+
+    def _docs_stamp(self):
+        try:
+            st = (self.index_dir / 'docs.log').stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _shard_path(self, shard: int):
+        return self.index_dir / f'postings-{shard:03d}.log'
+
+    def _get_index(self):
+        """
+        Return the index, loading its document table if needed.
+
+        Postings shards load lazily. Any write by another process appends to
+        docs.log, so a changed docs.log drops every cached shard. A missing
+        or outdated docs.log resets the whole index; stale files are removed
+        on the next flush.
+        """
+        stamp = self._docs_stamp()
+        if self._index is not None and stamp == self._index_stamp:
+            return self._index
+
+        index = {'docs': {}, 'shards': {}, 'pending': {}, 'reset': True}
+        lines = 0
+        try:
+            with open(self.index_dir / 'docs.log') as f:
+                header = json.loads(f.readline() or '{}')
+                if header.get('version') == INDEX_VERSION:
+                    index['reset'] = False
+                    for line in f:
+                        lines += 1
+                        try:
+                            entry = json.loads(line)
+                            name, doc = entry['name'], entry['doc']
+                        except (ValueError, TypeError, KeyError):
+                            # A torn final line from an interrupted append
+                            continue
+                        if doc:
+                            index['docs'][name] = doc
+                        else:
+                            index['docs'].pop(name, None)
+        except (OSError, ValueError, AttributeError):
+            pass
+        self._index = index
+        self._index_stamp = stamp
+
+        if lines > 2 * len(index['docs']) + 64:
+            self._rewrite_log(self.index_dir / 'docs.log', [{'version': INDEX_VERSION}] + [
+                {'name': name, 'doc': doc} for name, doc in index['docs'].items()
+            ])
+            self._index_stamp = self._docs_stamp()
+        return index
+
+    def _get_shard(self, shard: int):
+        """Return a postings shard ({term: {name: tf}}), loading it on first use."""
+        index = self._get_index()
+        if shard not in index['shards']:
+            path = self._shard_path(shard)
+            self._flush(path)
+            doc_terms = {}
+            lines = 0
+            if not index['reset']:
+                try:
+                    with open(path) as f:
+                        for line in f:
+                            lines += 1
+                            try:
+                                name, terms = json.loads(line)
+                            except (ValueError, TypeError):
+                                continue
+                            if terms:
+                                doc_terms[name] = terms
+                            else:
+                                doc_terms.pop(name, None)
+                except OSError:
+                    pass
+            if lines > 2 * len(doc_terms) + 32:
+                self._rewrite_log(path, [[name, terms] for name, terms in doc_terms.items()])
+            postings = {}
+            for name, terms in doc_terms.items():
+                for term, tf in terms.items():
+                    postings.setdefault(term, {})[name] = tf
+            index['shards'][shard] = postings
+        return index['shards'][shard]
+
+    def _rewrite_log(self, path, entries):
+        """Atomically replace a log with one line per live entry."""
+        staged = path.with_suffix('.tmp')
+        with open(staged, 'w') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        os.replace(staged, path)
+
+    def _append(self, path, entry):
+        # Uses the index as loaded for the current operation; revalidating
+        # here could swap it out and drop lines already queued
+        self._index['pending'].setdefault(path, []).append(
+            json.dumps(entry, separators=(',', ':')) + '\n')
+
+    def _flush(self, only=None):
+        """Append pending lines to their logs (docs.log last, as the commit marker)."""
+        index = self._index
+        if index is None:
+            return
+        pending = index['pending']
+        if only is not None:
+            if only not in pending:
+                return
+            paths = [only]
+        else:
+            docs_log = self.index_dir / 'docs.log'
+            paths = sorted(p for p in pending if p != docs_log)
+            if docs_log in pending:
+                paths.append(docs_log)
+        if not paths:
+            return
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        if index['reset']:
+            for stale in self.index_dir.iterdir():
+                if stale.name.startswith(('docs.', 'postings-')):
+                    stale.unlink()
+            with open(self.index_dir / 'docs.log', 'w') as f:
+                f.write(json.dumps({'version': INDEX_VERSION}) + '\n')
+            index['reset'] = False
+        for path in paths:
+            with open(path, 'a') as f:
+                f.writelines(pending.pop(path))
+        self._index_stamp = self._docs_stamp()
+
+    def _save_index(self):
+        """Persist pending index updates."""
+        self._flush()
+
+    def _remove_from_index(self, name: str):
+        """Drop a checkpoint from the index, touching only the shards it was in."""
+        index = self._get_index()
+        doc = index['docs'].pop(name, None)
+        if doc is None:
+            return
+        for shard in doc.get('shards', []):
+            self._set_shard_terms(shard, name, None)
+        self._append(self.index_dir / 'docs.log', {'name': name, 'doc': None})
+
+    def _set_shard_terms(self, shard: int, name: str, terms):
+        """Record a checkpoint's terms in one shard (None removes them)."""
+        postings = self._index['shards'].get(shard)
+        if postings is not None:
+            for term in [t for t, docs in postings.items() if name in docs]:
+                del postings[term][name]
+                if not postings[term]:
+                    del postings[term]
+            for term, tf in (terms or {}).items():
+                postings.setdefault(term, {})[name] = tf
+        self._append(self._shard_path(shard), [name, terms])
+
+    def _add_to_index(self, name: str, data: dict, mtime_ns: int):
+        """(Re)index one checkpoint."""
+        index = self._get_index()
+        terms = checkpoint_terms(data)
+        by_shard = {}
+        for term, tf in terms.items():
+            by_shard.setdefault(term_shard(term), {})[term] = tf
+
+        old = index['docs'].get(name)
+        for shard in set(old.get('shards', []) if old else []) - set(by_shard):
+            self._set_shard_terms(shard, name, None)
+        for shard, shard_terms in by_shard.items():
+            self._set_shard_terms(shard, name, shard_terms)
+
+        doc = {
+            'mtime_ns': mtime_ns,
+            'length': sum(terms.values()),
+            'timestamp': data.get('timestamp', 'unknown'),
+            'summary': str(data.get('summary', data.get('note', '')))[:100],
+            'shards': sorted(by_shard),
+        }
+        index['docs'][name] = doc
+        self._append(self.index_dir / 'docs.log', {'name': name, 'doc': doc})
+
+    def _sync_index(self):
+        """
+        Bring the index in line with the checkpoint directory.
+
+        Checkpoints can also be written by the slash command or the session-end
+        hook, so this stats every file and only opens the new or changed ones.
+        Returns True if the index changed.
+        """
+        index = self._get_index()
+        on_disk = {}
+        if self.checkpoint_dir.exists():
+            with os.scandir(self.checkpoint_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.json') and entry.is_file():
+                        on_disk[entry.name[:-5]] = entry.stat().st_mtime_ns
+
+        changed = False
+        for name in set(index['docs']) - set(on_disk):
+            self._remove_from_index(name)
+            changed = True
+
+        for name, mtime_ns in on_disk.items():
+            doc = index['docs'].get(name)
+            if doc and doc['mtime_ns'] == mtime_ns:
+                continue
+            try:
+                with open(self.path(name)) as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                data = {}
+            self._add_to_index(name, data if isinstance(data, dict) else {}, mtime_ns)
+            changed = True
+        return changed
+
+def read_stdin_json():
+    """Read checkpoint data from stdin ({} when stdin is a terminal)."""
+    return json.loads(sys.stdin.read()) if not sys.stdin.isatty() else {}
+
+def main(argv=None):
+    """CLI interface for checkpoint manager."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: checkpoint-manager.py <action> [args]")
+        print("Actions: list, save [--with-metrics], load, delete, search")
+        sys.exit(1)
+
+    action = argv[0].lower()
+    store = CheckpointStore()
+
+    if action == 'list':
+        checkpoints = store.list()
+        if not store.checkpoint_dir.exists():
+            print("No checkpoints found.")
+        for cp in checkpoints:
+            print(f"  {cp['name']}: {cp['timestamp']}")
+            if cp['summary']:
+                print(f"    {cp['summary'][:80]}...")
+
+    elif action == 'save':
+        if len(argv) < 2:
+            print("Usage: checkpoint-manager.py save <name> [--with-metrics]")
+            sys.exit(1)
+        name = argv[1]
+        # Read checkpoint data from stdin
+        data = read_stdin_json()
+        if '--with-metrics' in argv[2:]:
+            from .tracker import SessionTracker
+            path = store.save_with_metrics(name, data, SessionTracker())
+        else:
+            path = store.save(name, data)
+        print(f"Checkpoint saved: {path}")
+
+    elif action == 'load':
+        if len(argv) < 2:
+            print("Usage: checkpoint-manager.py load <name>")
+            sys.exit(1)
+        name = argv[1]
+        checkpoint = store.load(name)
+        if checkpoint:
+            print(json.dumps(checkpoint, indent=2))
+        else:
+            print(f"Checkpoint not found: {name}")
+
+    elif action == 'delete':
+        if len(argv) < 2:
+            print("Usage: checkpoint-manager.py delete <name>")
+            sys.exit(1)
+        name = argv[1]
+        if store.delete(name):
+            print(f"Checkpoint deleted: {name}")
+        else:
+            print(f"Checkpoint not found: {name}")
+
+    elif action == 'search':
+        if len(argv) < 2:
+            print("Usage: checkpoint-manager.py search <query>")
+            sys.exit(1)
+        query = ' '.join(argv[1:])
+        results = store.search(query)
+        if not results:
+            print(f"No checkpoints match: {query}")
+        for cp in results:
+            print(f"  {cp['name']}: {cp['timestamp']} (score {cp['score']})")
+            if cp['summary']:
+                print(f"    {cp['summary'][:80]}...")
+
+    else:
+        print(f"Unknown action: {action}")
+        sys.exit(1)
@@ -0,0 +1,247 @@
+"""
+Streaming export helpers shared by the tracker and analytics stores.
+
+Records are plain dicts produced by generators and written one per line
+(NDJSON), optionally gzip-compressed, so exports never build the whole
+document as a single string. The source documents themselves are loaded
+whole: metrics.json is size-capped by bounded tracking and analytics.json
+by the 30-day retention window.
+
+Every record carries a "type". Records tied to a moment (the session
+header, compaction events, analytics sessions) also carry a "ts" (ISO
+timestamp) used for time-range filtering; per-session aggregates such as
+tool counts and file lists have no timestamp and are never time-filtered.
+"""
+
+import gzip
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from . import snapshot
+
+
+def parse_timestamp(value):
+    """Parse an ISO timestamp into a naive local datetime (or None)."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
+
+def load_json_file(path):
+    """Load a JSON document, returning None if missing or unreadable."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+
+
+def summarize_compactions(events):
+    """
+    Summarize measured compaction events.
+
+    Returns the number measured, total tokens before and reclaimed, and a
+    per-strategy breakdown ({strategy: {"count", "tokens_before",
+    "tokens_reclaimed"}}) from which retained ratios can be derived. Only
+    events whose sizes come from real usage figures count; estimated
+    events and those still waiting for their "after" size are ignored.
+    """
+    measured = [e for e in events if e.get("measured") and e.get("tokens_reclaimed") is not None]
+    strategies = {}
+    for e in measured:
+        entry = strategies.setdefault(e.get("strategy", "unknown"),
+                                      {"count": 0, "tokens_before": 0, "tokens_reclaimed": 0})
+        entry["count"] += 1
+        entry["tokens_before"] += e["tokens_before"]
+        entry["tokens_reclaimed"] += e["tokens_reclaimed"]
+    return {
+        "compactions_measured": len(measured),
+        "compaction_tokens_before": sum(e["tokens_before"] for e in measured),
+        "tokens_reclaimed": sum(e["tokens_reclaimed"] for e in measured),
+        "compaction_strategies": strategies,
+    }
+
+
+# === Record generators ===
+
+def iter_metrics_records(metrics, now=None):
+    """
+    Yield records for a metrics document: one session header, then details.
+
+    The header's duration runs up to ``now`` (default current time).
+    """
+    m = metrics.get("metrics", {})
+    started_at = metrics.get("started_at")
+    session_id = metrics.get("session_id", "unknown")
+    events = metrics.get("compaction_events", [])
+
+    started = parse_timestamp(started_at)
+    duration = ((now or datetime.now()) - started).total_seconds() / 60 if started else 0
+
+    yield {
+        "type": "session",
+        "ts": started_at,
+        "session_id": session_id,
+        "started_at": started_at,
+        "last_activity": metrics.get("last_activity"),
+        "duration_minutes": round(duration, 1),
+        "health_score": metrics.get("health_score", 100),
+        "total_tool_calls": m.get("total_tool_calls", 0),
+        "files_read_count": m.get("distinct_files_read", len(m.get("files_read", []))),
+        "files_written_count": m.get("distinct_files_written", len(m.get("files_written", []))),
+        "tracking_mode": m.get("tracking_mode", "exact"),
+        "estimated_tokens_in": m.get("estimated_tokens_in", 0),
+        "estimated_tokens_out": m.get("estimated_tokens_out", 0),
+        "checkpoints_created": m.get("checkpoints_created", 0),
+        "compactions_triggered": m.get("compactions_triggered", 0),
+        "redundant_reads": m.get("redundant_reads", 0),
+        "wasted_tokens": m.get("wasted_tokens", 0),
+        **summarize_compactions(events),
+    }
+
+    for tool, count in m.get("tool_invocations", {}).items():
+        yield {"type": "tool", "session_id": session_id, "tool": tool, "count": count}
+
+    for path in m.get("files_read", []):
+        yield {"type": "file_read", "session_id": session_id, "path": path}
+
+    for path in m.get("files_written", []):
+        yield {"type": "file_written", "session_id": session_id, "path": path}
+
+    for event in events:
+        record = {"type": "compaction", "ts": event.get("at"), "session_id": session_id}
+        record.update(event)
+        yield record
+
+
+def load_metrics_file(path):
+    """Load metrics.json, preferring a binary snapshot (metrics.bin) beside it."""
+    snapshot_path = Path(path).with_suffix(".bin")
+    if snapshot_path.exists():
+        try:
+            return snapshot.load(snapshot_path)
+        except (ValueError, OSError):
+            pass
+    return load_json_file(path)
+
+
+def iter_metrics_file(path):
+    """Yield metrics records straight from a metrics file."""
+    metrics = load_metrics_file(path)
+    if metrics:
+        yield from iter_metrics_records(metrics)
+
+
+def iter_session_records(analytics):
+    """Yield one record per session summary in an analytics document."""
+    for s in analytics.get("sessions", []):
+        record = {"type": "session", "ts": s.get("ended_at") or s.get("started_at")}
+        record.update(s)
+        yield record
+
+
+# === Pipeline stages ===
+
+def filter_time_range(records, since=None, until=None):
+    """
+    Drop records whose timestamp falls outside [since, until].
+
+    Records without a "ts" key are untimed aggregates and always pass.
+    """
+    since_dt = parse_timestamp(since)
+    until_dt = parse_timestamp(until)
+    for record in records:
+        if (since_dt or until_dt) and "ts" in record:
+            ts = parse_timestamp(record.get("ts"))
+            if ts is None:
+                continue
+            if since_dt and ts < since_dt:
+                continue
+            if until_dt and ts > until_dt:
+                continue
+        yield record
+
+
+def select_fields(records, fields=None):
+    """
+    Project records onto the requested fields (the type is always kept).
+
+    Records carrying none of the requested fields are dropped.
+    """
+    if not fields:
+        yield from records
+        return
+    for record in records:
+        projected = {k: record[k] for k in fields if k in record}
+        if projected:
+            projected["type"] = record.get("type")
+            yield projected
+
+
+def write_ndjson(records, out=None, compress=False):
+    """Write records as NDJSON to a text stream (or gzip to stdout's buffer)."""
+    out = out or sys.stdout
+    count = 0
+    if compress:
+        target = getattr(out, "buffer", out)
+        with gzip.GzipFile(fileobj=target, mode="wb") as gz:
+            for record in records:
+                gz.write((json.dumps(record) + "\n").encode("utf-8"))
+                count += 1
+    else:
+        for record in records:
+            out.write(json.dumps(record))
+            out.write("\n")
+            count += 1
+    out.flush()
+    return count
+
+
+def parse_export_args(args):
+    """
+    Parse export options.
+
+    Supports: --format json|ndjson, --gzip, --since ISO, --until ISO,
+    --fields a,b,c. Any filter or --gzip implies ndjson.
+    """
+    opts = {"format": "json", "gzip": False, "since": None, "until": None, "fields": None}
+    it = iter(args)
+    for arg in it:
+        if arg == "--gzip":
+            opts["gzip"] = True
+        elif arg in ("--format", "--since", "--until", "--fields"):
+            value = next(it, None)
+            if value is None:
+                raise ValueError(f"Missing value for {arg}")
+            if arg == "--fields":
+                opts["fields"] = [f.strip() for f in value.split(",") if f.strip()]
+            elif arg in ("--since", "--until") and parse_timestamp(value) is None:
+                raise ValueError(f"Invalid timestamp for {arg}: {value}")
+            else:
+                opts[arg[2:]] = value
+        else:
+            raise ValueError(f"Unknown export option: {arg}")
+
+    if opts["format"] not in ("json", "ndjson"):
+        raise ValueError(f"Unknown export format: {opts['format']}")
+    if opts["gzip"] or opts["since"] or opts["until"] or opts["fields"]:
+        opts["format"] = "ndjson"
+    return opts
+
+
+def export_records(records, opts, out=None):
+    """Run records through the filter pipeline and write them as NDJSON."""
+    records = filter_time_range(records, opts.get("since"), opts.get("until"))
+    records = select_fields(records, opts.get("fields"))
+    return write_ndjson(records, out, compress=opts.get("gzip", False))
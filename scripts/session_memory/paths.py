@@ -0,0 +1,16 @@
+"""Plugin path resolution shared by the session_memory modules."""
+
+import os
+from pathlib import Path
+
+
+def get_plugin_root(plugin_root=None):
+    """Get the plugin root directory (CLAUDE_PLUGIN_ROOT or the repo checkout)."""
+    if plugin_root is not None:
+        return Path(plugin_root)
+    return Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent.parent))
+
+
+def get_data_dir(plugin_root=None):
+    """Get the plugin data directory."""
+    return get_plugin_root(plugin_root) / "data"
@@ -0,0 +1,149 @@
+"""
+Fixed-size sketches for bounded session tracking.
+
+Used by the tracker once a session touches too many distinct files
+to keep exact per-file lists. Every sketch serializes to a small
+JSON-friendly dict so it can live inside metrics.json.
+
+Error bounds (see README "Bounded Tracking"):
+- HyperLogLog with 2^12 registers: ~1.6% standard error on distinct counts.
+- Bloom filter with 2^19 bits and 5 hashes: < 2% false positives up to
+  60k keys. A false positive makes a new file look already seen. The
+  tracker only uses filters for membership, never to gate HyperLogLog
+  updates, so false positives cannot skew distinct counts.
+- Space-Saving with K counters: any file read more than N/K times is
+  guaranteed to be kept, and each count overestimates by at most its
+  recorded error.
+"""
+
+import base64
+import hashlib
+import math
+
+
+def _hash64(key, salt=b""):
+    """Return a 64-bit hash of a string key."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8, salt=salt).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _encode(data):
+    return base64.b64encode(bytes(data)).decode("ascii")
+
+
+def _decode(text, size):
+    data = bytearray(base64.b64decode(text)) if text else bytearray()
+    return data if len(data) == size else bytearray(size)
+
+
+class HyperLogLog:
+    """Distinct-count estimator with 2^p one-byte registers."""
+
+    def __init__(self, p=12, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = registers if registers is not None else bytearray(self.m)
+
+    def add(self, key):
+        h = _hash64(key)
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # Small-range correction (linear counting)
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def to_dict(self):
+        return {"p": self.p, "registers": _encode(self.registers)}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        p = data.get("p", 12)
+        return cls(p, _decode(data.get("registers"), 1 << p))
+
+
+class BloomFilter:
+    """Approximate set membership with no false negatives."""
+
+    def __init__(self, bits=1 << 19, hashes=5, data=None):
+        self.bits = bits
+        self.hashes = hashes
+        self.data = data if data is not None else bytearray(bits // 8)
+
+    def _positions(self, key):
+        h1 = _hash64(key)
+        h2 = _hash64(key, salt=b"bloom") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, key):
+        """Add a key; return True if it was (probably) already present."""
+        present = True
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self.data[byte] & (1 << bit):
+                present = False
+                self.data[byte] |= 1 << bit
+        return present
+
+    def __contains__(self, key):
+        return all(self.data[pos // 8] & (1 << (pos % 8)) for pos in self._positions(key))
+
+    def to_dict(self):
+        return {"bits": self.bits, "hashes": self.hashes, "data": _encode(self.data)}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        bits = data.get("bits", 1 << 19)
+        return cls(bits, data.get("hashes", 5), _decode(data.get("data"), bits // 8))
+
+
+class SpaceSaving:
+    """
+    Top-K heavy hitters (Metwally et al. Space-Saving).
+
+    Each entry is path -> [count, error, last_seen]; ``last_seen`` is a
+    caller-supplied sequence number used to order entries by recency.
+    """
+
+    def __init__(self, k=100, entries=None):
+        self.k = k
+        self.entries = entries if entries is not None else {}
+
+    def add(self, key, seen):
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry[0] += 1
+            entry[2] = seen
+        elif len(self.entries) < self.k:
+            self.entries[key] = [1, 0, seen]
+        else:
+            victim = min(self.entries, key=lambda k: self.entries[k][0])
+            floor = self.entries.pop(victim)[0]
+            self.entries[key] = [floor + 1, floor, seen]
+
+    def by_recency(self):
+        """Return tracked keys, least recently seen first."""
+        return sorted(self.entries, key=lambda k: self.entries[k][2])
+
+    def top(self, n=None):
+        """Return (key, count, error) tuples, most frequent first."""
+        ranked = sorted(self.entries.items(), key=lambda x: x[1][0], reverse=True)
+        return [(k, v[0], v[1]) for k, v in ranked[:n]]
+
+    def to_dict(self):
+        return {"k": self.k, "entries": self.entries}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(data.get("k", 100), data.get("entries", {}))
@@ -0,0 +1,240 @@
+"""
+Compact binary snapshot format for session tracker state.
+
+Layout (little-endian, version 1):
+
+    magic "SMOS" | version u16 | reserved u16
+    strings:   count u32, byte length u32, then the UTF-8 strings
+               joined by NUL (paths and tool names never contain NUL)
+    header:    session_id u32 (string index), started_at i64,
+               last_activity i64, health_score i32
+    counters:  one i64 per COUNTER_FIELDS entry
+    tools:     count u32, then per tool: name u32, calls u32
+    files_read / files_written / working_set:
+               count u32, then a u32 string index per path
+    extras:    length u32 + JSON object for every other key
+               (compaction events, sketches, ...)
+
+Paths and tool names are interned in the string table. Timestamps are
+microseconds since 1970-01-01 in local wall-clock time; NO_TIMESTAMP
+marks a missing value. Reads go through mmap, so only the pages that
+are touched get loaded.
+
+load() returns the same dict shape the JSON format uses, as a Snapshot
+whose ``epoch_us`` keeps the stored integer timestamps so readers can
+skip parsing the ISO strings.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+from itertools import chain
+
+MAGIC = b"SMOS"
+VERSION = 1
+NO_TIMESTAMP = -(1 << 63)
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+COUNTER_FIELDS = (
+    "total_tool_calls",
+    "estimated_tokens_in",
+    "estimated_tokens_out",
+    "checkpoints_created",
+    "compactions_triggered",
+    "context_tokens",
+)
+LIST_FIELDS = ("files_read", "files_written", "working_set")
+METRICS_ORDER = (
+    "files_read", "files_written", "tool_invocations",
+    "total_tool_calls", "estimated_tokens_in", "estimated_tokens_out",
+    "checkpoints_created", "compactions_triggered", "context_tokens", "working_set",
+)
+TOP_LEVEL_FIELDS = ("session_id", "started_at", "last_activity", "health_score", "metrics")
+
+_HEADER = struct.Struct("<4sHH")
+_U32 = struct.Struct("<I")
+_SESSION = struct.Struct("<Iqqi")
+_TOOL = struct.Struct("<II")
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is truncated, corrupt or of an unknown version."""
+
+
+class Snapshot(dict):
+    """
+    A metrics document read from a binary snapshot.
+
+    ``epoch_us`` maps each header timestamp string to the microseconds it
+    was stored as. Keying by the string means a caller that replaces a
+    timestamp never sees a stale integer.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.epoch_us = {}
+
+
+def to_datetime(epoch_us):
+    """Convert stored microseconds back to a naive local datetime."""
+    return EPOCH + epoch_us * MICROSECOND
+
+
+def _to_epoch(value):
+    if not value:
+        return NO_TIMESTAMP
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return NO_TIMESTAMP
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return (dt - EPOCH) // MICROSECOND
+
+
+def _from_epoch(value):
+    if value == NO_TIMESTAMP:
+        return None
+    return (EPOCH + value * MICROSECOND).isoformat()
+
+
+def _pack_indices(indices):
+    packed = array("I", indices)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_indices(data):
+    indices = array("I")
+    indices.frombytes(data)
+    if sys.byteorder == "big":
+        indices.byteswap()
+    return indices
+
+
+def dump(metrics, path):
+    """Write a metrics document as a binary snapshot."""
+    m = metrics.get("metrics", {})
+    session_id = str(metrics.get("session_id", "unknown"))
+    tool_invocations = m.get("tool_invocations", {})
+
+    # Intern every string once; dict keys keep first-seen order
+    strings = dict.fromkeys(chain([session_id], tool_invocations, *(m.get(f, []) for f in LIST_FIELDS)))
+    index = {s: i for i, s in enumerate(strings)}
+
+    session_idx = index[session_id]
+    tools = [(index[name], count) for name, count in tool_invocations.items()]
+    lists = [[index[p] for p in m.get(field, [])] for field in LIST_FIELDS]
+
+    extras = {k: v for k, v in metrics.items() if k not in TOP_LEVEL_FIELDS}
+    extra_metrics = {
+        k: v for k, v in m.items()
+        if k not in COUNTER_FIELDS and k not in LIST_FIELDS and k != "tool_invocations"
+    }
+    if extra_metrics:
+        extras["metrics"] = extra_metrics
+    extras_blob = json.dumps(extras, separators=(",", ":")).encode("utf-8") if extras else b""
+
+    table = "\0".join(strings).encode("utf-8")
+    parts = [_HEADER.pack(MAGIC, VERSION, 0), _U32.pack(len(strings)), _U32.pack(len(table)), table]
+    parts.append(_SESSION.pack(
+        session_idx,
+        _to_epoch(metrics.get("started_at")),
+        _to_epoch(metrics.get("last_activity")),
+        int(metrics.get("health_score", 100)),
+    ))
+    parts.append(struct.pack(f"<{len(COUNTER_FIELDS)}q", *(int(m.get(f, 0)) for f in COUNTER_FIELDS)))
+    parts.append(_U32.pack(len(tools)))
+    parts.extend(_TOOL.pack(idx, count) for idx, count in tools)
+    for indices in lists:
+        parts.append(_U32.pack(len(indices)))
+        parts.append(_pack_indices(indices))
+    parts.append(_U32.pack(len(extras_blob)))
+    parts.append(extras_blob)
+
+    with open(path, "wb") as f:
+        f.write(b"".join(parts))
+
+
+def load(path):
+    """Read a binary snapshot into a metrics document."""
+    with open(path, "rb") as f:
+        if not f.seek(0, 2):
+            raise SnapshotError("Empty snapshot")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            try:
+                return _parse(buf)
+            except (struct.error, IndexError, OverflowError, UnicodeDecodeError, json.JSONDecodeError) as e:
+                raise SnapshotError(f"Corrupt snapshot: {e}") from e
+
+
+def _parse(buf):
+    magic, version, _ = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise SnapshotError("Not a metrics snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version: {version}")
+    offset = _HEADER.size
+
+    count, length = struct.unpack_from("<II", buf, offset)
+    offset += 8
+    strings = buf[offset:offset + length].decode("utf-8").split("\0") if count else []
+    if len(strings) != count:
+        raise SnapshotError("Corrupt snapshot string table")
+    offset += length
+
+    session_idx, started, last_activity, health = _SESSION.unpack_from(buf, offset)
+    offset += _SESSION.size
+
+    counters = struct.unpack_from(f"<{len(COUNTER_FIELDS)}q", buf, offset)
+    offset += 8 * len(COUNTER_FIELDS)
+    m = dict(zip(COUNTER_FIELDS, counters))
+
+    (count,) = _U32.unpack_from(buf, offset)
+    offset += 4
+    tools = {}
+    for _ in range(count):
+        idx, calls = _TOOL.unpack_from(buf, offset)
+        offset += _TOOL.size
+        tools[strings[idx]] = calls
+    m["tool_invocations"] = tools
+
+    for field in LIST_FIELDS:
+        (count,) = _U32.unpack_from(buf, offset)
+        offset += 4
+        if offset + 4 * count > len(buf):
+            raise SnapshotError(f"Truncated snapshot {field}")
+        indices = _unpack_indices(buf[offset:offset + 4 * count])
+        offset += 4 * count
+        m[field] = [strings[i] for i in indices]
+
+    (length,) = _U32.unpack_from(buf, offset)
+    offset += 4
+    if offset + length > len(buf):
+        raise SnapshotError("Truncated snapshot extras")
+    extras = json.loads(buf[offset:offset + length]) if length else {}
+    if not isinstance(extras, dict) or not isinstance(extras.get("metrics", {}), dict):
+        raise SnapshotError("Corrupt snapshot extras")
+    m.update(extras.pop("metrics", {}))
+
+    # Rebuild keys in the order the JSON format writes them
+    ordered = {k: m.pop(k) for k in METRICS_ORDER if k in m}
+    ordered.update(m)
+
+    metrics = Snapshot(
+        session_id=strings[session_idx],
+        started_at=_from_epoch(started),
+        metrics=ordered,
+    )
+    metrics.update(extras)
+    metrics["last_activity"] = _from_epoch(last_activity)
+    metrics["health_score"] = health
+    for value in (started, last_activity):
+        if value != NO_TIMESTAMP:
+            metrics.epoch_us[_from_epoch(value)] = value
+    return metrics
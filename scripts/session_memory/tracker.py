@@ -0,0 +1,918 @@
+"""
+Session Metrics Tracker - Core metrics collection and health calculation.
+
+SessionTracker gives in-process access to the live session metrics; the
+module-level functions operate on a plain metrics document and are shared
+with transcript backfill.
+
+Usage:
+    python3 metrics-tracker.py init          # Initialize new session (hook JSON on stdin
+                                             # supplies the session_id)
+    python3 metrics-tracker.py record [tool] # Record tool usage (reads hook JSON from stdin;
+                                             # the tool defaults to its tool_name)
+    python3 metrics-tracker.py status        # Display health dashboard
+    python3 metrics-tracker.py export        # Export metrics as JSON
+    python3 metrics-tracker.py export --format ndjson [--gzip]
+                               [--since ISO] [--until ISO] [--fields a,b]
+                                             # Stream metrics + events as NDJSON
+    python3 metrics-tracker.py compaction    # Record a compaction event (hook JSON on stdin)
+    python3 metrics-tracker.py analyze       # Analyze for optimization recommendations
+    python3 metrics-tracker.py checkpoint    # Increment the checkpoint counter
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from . import export_stream, snapshot
+from .paths import get_data_dir
+from .sketches import BloomFilter, HyperLogLog, SpaceSaving
+
+# Tool calls observed after a compaction before its "after" size is taken
+COMPACTION_OBSERVE_CALLS = 5
+# Tail of the session transcript scanned for the latest API usage figures
+TRANSCRIPT_TAIL_BYTES = 256 * 1024
+
+# Files up to this size are hashed in full; larger ones are sampled
+HASH_FULL_LIMIT = 1024 * 1024
+HASH_SAMPLE_CHUNK = 64 * 1024
+HASH_SAMPLE_COUNT = 16
+
+# Switch to sketch-based tracking once this many distinct files are tracked
+BOUNDED_FILE_THRESHOLD = 2000
+# Files kept with exact per-file detail in bounded mode
+TOP_K_FILES = 100
+# Token estimate for a Read whose file cannot be sized
+DEFAULT_READ_TOKENS = 500
+
+
+def get_default_metrics():
+    """Return default metrics structure."""
+    return {
+        "session_id": str(uuid.uuid4())[:8],
+        "started_at": datetime.now().isoformat(),
+        "metrics": {
+            "files_read": [],
+            "files_written": [],
+            "tool_invocations": {},
+            "total_tool_calls": 0,
+            "estimated_tokens_in": 0,
+            "estimated_tokens_out": 0,
+            "checkpoints_created": 0,
+            "compactions_triggered": 0,
+            "context_tokens": 0,
+            "working_set": [],
+        },
+        "compaction_events": [],
+        "last_activity": datetime.now().isoformat(),
+        "health_score": 100,
+    }
+
+
+@lru_cache(maxsize=8)
+def parse_iso(value):
+    """Parse an ISO timestamp, caching the few distinct values a session uses."""
+    return datetime.fromisoformat(value)
+
+
+def get_duration_minutes(metrics, now=None, session_start_file=None):
+    """Calculate session duration in minutes (up to ``now``, default current time)."""
+    now = now or datetime.now()
+    try:
+        started_at = metrics["started_at"]
+        # Binary snapshots carry the stored integer, which skips parsing
+        epoch_us = getattr(metrics, "epoch_us", {}).get(started_at)
+        started = snapshot.to_datetime(epoch_us) if epoch_us is not None else parse_iso(started_at)
+        return (now - started).total_seconds() / 60
+    except (KeyError, TypeError, ValueError):
+        # Fallback to .session_start file
+        session_start_file = session_start_file or get_data_dir() / ".session_start"
+        if session_start_file.exists():
+            try:
+                started = datetime.fromisoformat(session_start_file.read_text().strip())
+                return (now - started).total_seconds() / 60
+            except (ValueError, IOError):
+                pass
+    return 0
+
+
+def calculate_health_score(metrics, now=None, session_start_file=None):
+    """
+    Calculate health score 0-100 based on session activity.
+
+    Penalties:
+    - Duration: -1 point per 12 minutes (max -30)
+    - Tool calls: -1 point per 10 calls (max -25)
+    - Files read: -1 point per 2 files (max -20)
+    - Estimated tokens: -1 point per 4000 tokens (max -25)
+    - Redundant reads: -1 point per 2000 tokens wasted on unchanged re-reads (max -10)
+    """
+    score = 100
+    m = metrics.get("metrics", {})
+
+    # Duration penalty (max -30 points)
+    duration = get_duration_minutes(metrics, now, session_start_file)
+    duration_penalty = min(30, duration / 12)
+    score -= duration_penalty
+
+    # Tool calls penalty (max -25 points)
+    tool_calls = m.get("total_tool_calls", 0)
+    tool_penalty = min(25, tool_calls / 10)
+    score -= tool_penalty
+
+    # Files read penalty (max -20 points)
+    files_count = count_files(m, "read")
+    files_penalty = min(20, files_count / 2)
+    score -= files_penalty
+
+    # Token estimate penalty (max -25 points)
+    tokens = m.get("estimated_tokens_in", 0) + m.get("estimated_tokens_out", 0)
+    token_penalty = min(25, tokens / 4000)
+    score -= token_penalty
+
+    # Redundant read penalty (max -10 points)
+    redundant_penalty = min(10, m.get("wasted_tokens", 0) / 2000)
+    score -= redundant_penalty
+
+    return max(0, int(score))
+
+
+def get_health_level(score):
+    """Return health level string based on score."""
+    if score >= 80:
+        return "HEALTHY", "green"
+    elif score >= 60:
+        return "MODERATE", "yellow"
+    elif score >= 40:
+        return "ELEVATED", "orange"
+    else:
+        return "CRITICAL", "red"
+
+
+def count_files(m, kind):
+    """Distinct files read or written (an HLL estimate in bounded mode)."""
+    return m.get(f"distinct_files_{kind}", len(m.get(f"files_{kind}", [])))
+
+
+def working_set_size(m, sk=None):
+    """Distinct files touched since the last compaction."""
+    if sk is not None:
+        return sk["hll_working"].count()
+    if m.get("tracking_mode") == "bounded":
+        return m.get("working_set_size", 0)
+    return len(m.get("working_set", []))
+
+
+# === Bounded tracking ===
+
+def open_sketches(m):
+    """Deserialize the bounded-mode sketches stored in a metrics document."""
+    state = m.get("sketch", {})
+    return {
+        "seen": BloomFilter.from_dict(state.get("seen")),
+        "seen_working": BloomFilter.from_dict(state.get("seen_working")),
+        "hll_read": HyperLogLog.from_dict(state.get("hll_read")),
+        "hll_written": HyperLogLog.from_dict(state.get("hll_written")),
+        "hll_working": HyperLogLog.from_dict(state.get("hll_working")),
+        "top_read": SpaceSaving.from_dict(state.get("top_read") or {"k": TOP_K_FILES}),
+        "top_written": SpaceSaving.from_dict(state.get("top_written") or {"k": TOP_K_FILES}),
+    }
+
+
+def store_sketches(m, sk):
+    """Serialize sketches back into the metrics document and refresh their estimates."""
+    # Keep fingerprints only for the heavy hitters
+    fingerprints = m.get("read_fingerprints", {})
+    for path in [p for p in fingerprints if p not in sk["top_read"].entries]:
+        del fingerprints[path]
+    for kind in ("read", "written"):
+        m[f"distinct_files_{kind}"] = sk[f"hll_{kind}"].count()
+        m[f"files_{kind}"] = sk[f"top_{kind}"].by_recency()
+    m["working_set_size"] = sk["hll_working"].count()
+    m["sketch"] = {name: obj.to_dict() for name, obj in sk.items()}
+
+
+def track_file(m, kind, path, sk=None):
+    """
+    Track a file read ("read") or write ("written").
+
+    Returns (first_seen, entered_working_set). With sketches, membership
+    comes from Bloom filters, distinct counts from HyperLogLog, and
+    ``files_<kind>`` holds only the top-K files, least recent first; the
+    counts and lists in ``m`` are refreshed by store_sketches.
+    """
+    if sk is None:
+        files = m[f"files_{kind}"]
+        working_set = m.setdefault("working_set", [])
+        first = path not in files
+        if first:
+            files.append(path)
+        fresh = path not in working_set
+        if fresh:
+            working_set.append(path)
+        return first, fresh
+
+    # HyperLogLog tolerates repeats, so counts never depend on a filter
+    # false positive; the working set has its own filter, reset on compaction
+    first = not sk["seen"].add(f"{kind}:{path}")
+    fresh = not sk["seen_working"].add(path)
+    sk[f"hll_{kind}"].add(path)
+    sk["hll_working"].add(path)
+    sk[f"top_{kind}"].add(path, m["total_tool_calls"])
+    return first, fresh
+
+
+def switch_to_bounded(m):
+    """Fold exact file lists into sketches and enable bounded mode, returning the sketches."""
+    sk = open_sketches({})
+    seq = 0
+    for kind in ("read", "written"):
+        for path in m.get(f"files_{kind}", []):
+            seq += 1
+            sk["seen"].add(f"{kind}:{path}")
+            sk[f"hll_{kind}"].add(path)
+            sk[f"top_{kind}"].add(path, seq)
+
+    for path in m.get("working_set", []):
+        sk["seen_working"].add(path)
+        sk["hll_working"].add(path)
+    m["working_set"] = []
+
+    m["tracking_mode"] = "bounded"
+    store_sketches(m, sk)
+    return sk
+
+
+# === Redundant reads ===
+
+def hash_file(file_path, size):
+    """
+    Fingerprint file content through mmap.
+
+    Files up to HASH_FULL_LIMIT are hashed in full. Larger files hash
+    HASH_SAMPLE_COUNT evenly spaced chunks plus the size, so hook cost
+    stays bounded; a change outside the sampled chunks goes unnoticed.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(size.to_bytes(8, "little"))
+    if size == 0:
+        return h.hexdigest()
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if size <= HASH_FULL_LIMIT:
+                h.update(buf)
+            else:
+                step = (size - HASH_SAMPLE_CHUNK) // (HASH_SAMPLE_COUNT - 1)
+                for i in range(HASH_SAMPLE_COUNT):
+                    start = i * step
+                    h.update(buf[start:start + HASH_SAMPLE_CHUNK])
+    return h.hexdigest()
+
+
+def check_redundant_read(m, file_path, read_range, tokens):
+    """
+    Fingerprint a Read and flag it if it re-reads unchanged content.
+
+    The cached fingerprint is reused while mtime and size are unchanged, so
+    unchanged files are never rehashed. A re-read counts as redundant only
+    if it covers the same range as the previous read of that file since the
+    last compaction (record_compaction clears each entry's range).
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return False
+
+    fingerprints = m.setdefault("read_fingerprints", {})
+    entry = fingerprints.get(file_path)
+    if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+        digest = entry["hash"]
+    else:
+        try:
+            digest = hash_file(file_path, st.st_size)
+        except (OSError, ValueError):
+            return False
+
+    redundant = bool(entry) and entry["hash"] == digest and entry.get("range") == read_range
+    if entry is None:
+        entry = fingerprints[file_path] = {"reads": 0, "redundant_reads": 0, "wasted_tokens": 0}
+    entry.update(hash=digest, mtime_ns=st.st_mtime_ns, size=st.st_size, range=read_range)
+    entry["reads"] += 1
+
+    if redundant:
+        entry["redundant_reads"] += 1
+        entry["wasted_tokens"] += tokens
+        m["redundant_reads"] = m.get("redundant_reads", 0) + 1
+        m["wasted_tokens"] = m.get("wasted_tokens", 0) + tokens
+    return redundant
+
+
+def top_redundant_files(m, n=5):
+    """Return (path, entry) pairs for the files with the most wasted tokens."""
+    wasted = [(p, e) for p, e in m.get("read_fingerprints", {}).items() if e["redundant_reads"]]
+    return sorted(wasted, key=lambda x: x[1]["wasted_tokens"], reverse=True)[:n]
+
+
+def estimate_file_tokens(file_path):
+    """Estimate tokens for a file (rough: chars / 4)."""
+    try:
+        size = Path(file_path).stat().st_size
+        return size // 4  # Rough token estimate
+    except (OSError, IOError):
+        return DEFAULT_READ_TOKENS
+
+
+def record_tool(metrics, tool_name, details, hash_content=True, context_usage=None):
+    """
+    Apply one tool invocation to a metrics document in place.
+
+    ``hash_content`` fingerprints Read targets for redundant-read detection
+    and sizes them from disk; replays of historical sessions turn it off
+    since files have changed since, and count DEFAULT_READ_TOKENS per Read.
+    ``context_usage`` is the real context size at this call when the caller
+    already knows it (replays); otherwise it is read from the hook's
+    transcript when a compaction measurement needs it.
+    """
+    m = metrics["metrics"]
+    sk = open_sketches(m) if m.get("tracking_mode") == "bounded" else None
+    sk = apply_tool(metrics, tool_name, details, sk, hash_content, context_usage)
+    if sk is not None:
+        store_sketches(m, sk)
+
+
+def record_tools(metrics, events, hash_content=True):
+    """
+    Apply many (tool_name, details) invocations to a metrics document in place.
+
+    Bounded-mode sketches are decoded once before the batch and stored once
+    after it. Returns the number of events applied.
+    """
+    m = metrics["metrics"]
+    sk = open_sketches(m) if m.get("tracking_mode") == "bounded" else None
+    count = 0
+    for tool_name, details in events:
+        sk = apply_tool(metrics, tool_name, details or {}, sk, hash_content)
+        count += 1
+    if sk is not None:
+        store_sketches(m, sk)
+    return count
+
+
+def apply_tool(metrics, tool_name, details, sk, hash_content=True, context_usage=None):
+    """
+    Apply one tool invocation using already-open sketches (None in exact mode).
+
+    Returns the sketches to use for the next invocation, which are newly
+    opened if this call switched the session to bounded mode. The caller
+    stores them with store_sketches.
+    """
+    m = metrics["metrics"]
+    m.setdefault("context_tokens", 0)
+
+    # Increment tool count
+    m["tool_invocations"][tool_name] = m["tool_invocations"].get(tool_name, 0) + 1
+    m["total_tool_calls"] += 1
+
+    # Track file operations
+    if tool_name == "Read":
+        tool_input = details.get("tool_input", {})
+        file_path = details.get("file_path", tool_input.get("file_path", ""))
+        if file_path:
+            track_file(m, "read", file_path, sk)
+            tokens = estimate_file_tokens(file_path) if hash_content else DEFAULT_READ_TOKENS
+            # Every read lands in the context, re-reads included
+            m["context_tokens"] += tokens
+            m["estimated_tokens_in"] += tokens
+            if hash_content:
+                read_range = [tool_input.get("offset"), tool_input.get("limit")]
+                check_redundant_read(m, file_path, read_range, tokens)
+
+    elif tool_name in ("Write", "Edit"):
+        file_path = details.get("file_path", details.get("tool_input", {}).get("file_path", ""))
+        if file_path:
+            first, _ = track_file(m, "written", file_path, sk)
+            m["context_tokens"] += 500
+            if first:
+                m["estimated_tokens_out"] += 500  # Estimate for write
+
+    elif tool_name == "Bash":
+        m["estimated_tokens_out"] += 200  # Bash output estimate
+        m["context_tokens"] += 200
+
+    if sk is None and count_files(m, "read") + count_files(m, "written") > BOUNDED_FILE_THRESHOLD:
+        sk = switch_to_bounded(m)
+
+    observe_compaction(metrics, details.get("transcript_path"), context_usage, sk)
+    return sk
+
+
+# === Compaction measurement ===
+
+def usage_tokens(usage):
+    """Context size implied by an API usage block (all input token kinds), or None."""
+    if not isinstance(usage, dict):
+        return None
+    total = sum(usage.get(k) or 0 for k in
+                ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"))
+    return total or None
+
+
+def read_context_usage(transcript_path):
+    """
+    Return the context size reported by the latest assistant message.
+
+    Only the last TRANSCRIPT_TAIL_BYTES of the transcript are read. Returns
+    None if there is no transcript or no usage figure in that window.
+    """
+    if not transcript_path:
+        return None
+    try:
+        with open(transcript_path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - TRANSCRIPT_TAIL_BYTES))
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    for line in reversed(lines):
+        if b'"usage"' not in line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict):
+            tokens = usage_tokens((entry.get("message") or {}).get("usage"))
+            if tokens:
+                return tokens
+    return None
+
+
+def record_compaction(metrics, details, at=None, context_usage=None, sk=None):
+    """
+    Open a compaction event and reset the live context estimate.
+
+    The "before" size is the real context size: ``context_usage`` when given
+    (a replayed compactMetadata.preTokens), else the latest usage in the
+    hook's transcript. Without either, it falls back to the estimate
+    accumulated since the previous compaction and the event is marked
+    unmeasured. The "after" size is filled in by observe_compaction once
+    COMPACTION_OBSERVE_CALLS further tool calls have been recorded.
+    ``sk`` are the caller's open bounded-mode sketches, if any; their
+    working-set sketches are reset in place.
+    """
+    m = metrics["metrics"]
+    m["compactions_triggered"] = m.get("compactions_triggered", 0) + 1
+
+    if context_usage is None:
+        context_usage = read_context_usage(details.get("transcript_path"))
+    measured = context_usage is not None
+
+    trigger = details.get("trigger") or "unknown"
+    instructions = (details.get("custom_instructions") or "").strip()
+
+    metrics.setdefault("compaction_events", []).append({
+        "at": (at or datetime.now()).isoformat(),
+        "trigger": trigger,
+        "strategy": f"{trigger}+instructions" if instructions else trigger,
+        "instructions": instructions[:200],
+        "measured": measured,
+        "tokens_before": context_usage if measured else m.get("context_tokens", 0),
+        "working_set_before": working_set_size(m, sk),
+        "calls_observed": 0,
+        "tokens_after": None,
+        "working_set_after": None,
+        "tokens_reclaimed": None,
+        "retained_ratio": None,
+    })
+
+    m["context_tokens"] = 0
+    m["working_set"] = []
+    # Earlier reads have left the context, so the next read of any file is
+    # needed again; the cached hashes and the counters are kept
+    for entry in m.get("read_fingerprints", {}).values():
+        entry["range"] = None
+    if m.get("tracking_mode") == "bounded":
+        m["working_set_size"] = 0
+        sketch = m.setdefault("sketch", {})
+        sketch.pop("seen_working", None)
+        sketch.pop("hll_working", None)
+    if sk is not None:
+        sk["seen_working"] = BloomFilter.from_dict(None)
+        sk["hll_working"] = HyperLogLog.from_dict(None)
+
+
+def observe_compaction(metrics, transcript_path=None, context_usage=None, sk=None):
+    """
+    Count a tool call against the latest open compaction event, closing it when due.
+
+    A measured event takes its "after" size from real usage, which includes
+    the compaction summary kept in context. If usage is unavailable at that
+    point, the event is downgraded to unmeasured. An unmeasured event keeps
+    its raw estimates only: "before" covers everything since the previous
+    compaction and "after" only the calls observed since, so no reclaimed
+    tokens or retained ratio are derived from them. ``sk`` are the open
+    bounded-mode sketches, whose working set may not be stored yet.
+    """
+    events = metrics.get("compaction_events") or []
+    if not events or events[-1]["tokens_after"] is not None:
+        return
+    event = events[-1]
+    event["calls_observed"] += 1
+    if event["calls_observed"] >= COMPACTION_OBSERVE_CALLS:
+        m = metrics["metrics"]
+        if event.get("measured") and context_usage is None:
+            context_usage = read_context_usage(transcript_path)
+        if context_usage is None:
+            event["measured"] = False
+        before = event["tokens_before"]
+        after = context_usage if event["measured"] else m.get("context_tokens", 0)
+        event["tokens_after"] = after
+        event["working_set_after"] = working_set_size(m, sk)
+        if event["measured"]:
+            event["tokens_reclaimed"] = before - after
+            event["retained_ratio"] = round(after / before, 3) if before else None
+
+
+def parse_details(stdin_data):
+    """Parse hook JSON from stdin, returning {} when absent or invalid."""
+    if not stdin_data:
+        return {}
+    try:
+        details = json.loads(stdin_data)
+    except json.JSONDecodeError:
+        return {}
+    return details if isinstance(details, dict) else {}
+
+
+class SessionTracker:
+    """
+    In-process access to the live session metrics.
+
+    The metrics document is held in memory across calls and reloaded only
+    when another process (typically a hook) has rewritten it since it was
+    last read or saved. A document with unsaved changes is never reloaded,
+    and save() writes it exactly as held. Batch methods apply many updates
+    with a single save.
+    """
+
+    def __init__(self, plugin_root=None, snapshot_format=None):
+        self.data_dir = get_data_dir(plugin_root)
+        self.metrics_file = self.data_dir / "metrics.json"
+        self.snapshot_file = self.data_dir / "metrics.bin"
+        self.session_start_file = self.data_dir / ".session_start"
+        # "binary" stores state as a compact snapshot (see snapshot.py) instead of JSON
+        self.snapshot_format = snapshot_format or os.environ.get("SESSION_MEMORY_SNAPSHOT", "json")
+        self._metrics = None
+        self._stamp = None
+        self._dirty = False
+
+    def _file_stamp(self):
+        """Identify the on-disk state so external rewrites can be detected."""
+        for path in (self.snapshot_file, self.metrics_file):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            return (path.name, st.st_mtime_ns, st.st_size)
+        return None
+
+    @property
+    def metrics(self):
+        """The current metrics document (reloaded if changed on disk and not since modified here)."""
+        if self._metrics is None or (not self._dirty and self._file_stamp() != self._stamp):
+            self.reload()
+        return self._metrics
+
+    def reload(self):
+        """Load metrics from file, or fresh defaults if none are readable."""
+        self._stamp = self._file_stamp()
+        self._metrics = None
+        self._dirty = False
+        if self.snapshot_file.exists():
+            try:
+                self._metrics = snapshot.load(self.snapshot_file)
+            except (ValueError, OSError):
+                pass
+        if self._metrics is None and self.metrics_file.exists():
+            try:
+                with open(self.metrics_file) as f:
+                    self._metrics = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        if self._metrics is None:
+            self._metrics = get_default_metrics()
+        return self._metrics
+
+    def save(self):
+        """Save the in-memory metrics to file, even if the file changed since it was read."""
+        metrics = self._metrics if self._metrics is not None else self.reload()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        metrics["last_activity"] = datetime.now().isoformat()
+        metrics["health_score"] = calculate_health_score(metrics, session_start_file=self.session_start_file)
+        if self.snapshot_format == "binary":
+            snapshot.dump(metrics, self.snapshot_file)
+            self.metrics_file.unlink(missing_ok=True)
+        else:
+            with open(self.metrics_file, "w") as f:
+                json.dump(metrics, f, indent=2)
+            self.snapshot_file.unlink(missing_ok=True)
+        self._stamp = self._file_stamp()
+        self._dirty = False
+
+    def init_session(self, session_id=None):
+        """
+        Start a new session with fresh metrics; returns the session id.
+
+        Pass the Claude Code session id when known so the analytics entry
+        matches the one transcript backfill derives for the same session.
+        """
+        self._metrics = get_default_metrics()
+        if session_id:
+            self._metrics["session_id"] = session_id[:8]
+        self.save()
+        self.session_start_file.write_text(self._metrics["started_at"])
+        return self._metrics["session_id"]
+
+    def record(self, tool_name, details=None, hash_content=True):
+        """Record one tool invocation and save."""
+        record_tool(self.metrics, tool_name, details or {}, hash_content)
+        self.save()
+
+    def record_many(self, events, hash_content=True):
+        """
+        Record many (tool_name, details) invocations with a single save.
+
+        Returns the number of events recorded.
+        """
+        count = record_tools(self.metrics, events, hash_content)
+        if count:
+            self.save()
+        return count
+
+    def record_compaction(self, details=None):
+        """Record a compaction event and save."""
+        record_compaction(self.metrics, details or {})
+        self.save()
+
+    def increment_checkpoint(self, save=True):
+        """Increment the checkpoint counter."""
+        m = self.metrics["metrics"]
+        m["checkpoints_created"] = m.get("checkpoints_created", 0) + 1
+        if save:
+            self.save()
+        else:
+            self._dirty = True
+
+    def duration_minutes(self):
+        return get_duration_minutes(self.metrics, session_start_file=self.session_start_file)
+
+    def health_score(self):
+        return calculate_health_score(self.metrics, session_start_file=self.session_start_file)
+
+    def snapshot(self):
+        """Summary stored with checkpoints as ``metrics_snapshot``."""
+        m = self.metrics["metrics"]
+        return {
+            "duration_minutes": round(self.duration_minutes(), 1),
+            "health_score": self.health_score(),
+            "files_read_count": count_files(m, "read"),
+            "tool_calls": m.get("total_tool_calls", 0),
+        }
+
+    def iter_records(self):
+        """Yield export records for the current metrics, including compaction events."""
+        yield from export_stream.iter_metrics_records(self.metrics)
+
+
+# === Commands ===
+
+def cmd_status(tracker):
+    """Display session health dashboard."""
+    metrics = tracker.metrics
+    m = metrics.get("metrics", {})
+
+    duration = tracker.duration_minutes()
+    hours = int(duration // 60)
+    mins = int(duration % 60)
+    duration_str = f"{hours}h {mins}m" if hours > 0 else f"{mins}m"
+
+    score = metrics.get("health_score", tracker.health_score())
+    level, _ = get_health_level(score)
+
+    # Build progress bar
+    bar_filled = int(score / 10)
+    bar_empty = 10 - bar_filled
+    bar = "=" * bar_filled + " " * bar_empty
+
+    # Tool breakdown
+    tool_counts = m.get("tool_invocations", {})
+    top_tools = sorted(tool_counts.items(), key=lambda x: x[1], reverse=True)[:4]
+    tool_str = ", ".join(f"{t}: {c}" for t, c in top_tools) if top_tools else "None"
+
+    # Recommendations
+    recs = []
+    if score < 60 and m.get("checkpoints_created", 0) == 0:
+        recs.append("[!] Create a checkpoint: /session-checkpoint milestone")
+    if score < 50:
+        recs.append("[!] Run /session-optimize before context grows further")
+    if score < 30:
+        recs.append("[!] CRITICAL: Consider restarting session after checkpoint")
+    wasted = m.get("wasted_tokens", 0)
+    if wasted >= 5000:
+        recs.append(f"[!] {wasted} tokens spent re-reading unchanged files - refer back instead")
+    if not recs:
+        recs.append("[ ] Session is healthy - continue working")
+
+    # Calculate penalties for breakdown
+    duration_penalty = min(30, int(duration / 12))
+    tool_penalty = min(25, int(m.get("total_tool_calls", 0) / 10))
+    files_read = count_files(m, "read")
+    files_penalty = min(20, int(files_read / 2))
+    redundant_penalty = min(10, int(wasted / 2000))
+    approx = "~" if m.get("tracking_mode") == "bounded" else ""
+    tracking_str = (
+        f"\nTracking:        bounded (top {TOP_K_FILES} files exact, file counts ~1.6% error)"
+        if approx else ""
+    )
+
+    print(f"""SESSION HEALTH DASHBOARD
+========================
+Session ID:      {metrics.get('session_id', 'unknown')}
+Duration:        {duration_str}
+Health Score:    {score}/100 [{bar}] {level}
+
+ACTIVITY METRICS
+----------------
+Files Read:      {approx}{files_read}
+Files Written:   {approx}{count_files(m, 'written')}
+Tool Calls:      {m.get('total_tool_calls', 0)} ({tool_str})
+Checkpoints:     {m.get('checkpoints_created', 0)}
+Redundant Reads: {m.get('redundant_reads', 0)} ({wasted} tokens wasted){tracking_str}""")
+
+    for path, entry in top_redundant_files(m, 3):
+        print(f"  - {Path(path).name}: {entry['redundant_reads']}x unchanged, {entry['wasted_tokens']} tokens")
+
+    print(f"""
+HEALTH BREAKDOWN
+----------------
+Duration:        -{duration_penalty} pts ({duration_str})
+Tool Activity:   -{tool_penalty} pts ({m.get('total_tool_calls', 0)} calls)
+File Load:       -{files_penalty} pts ({approx}{files_read} files)
+Redundant Reads: -{redundant_penalty} pts ({wasted} tokens)
+
+RECOMMENDATIONS
+---------------""")
+    for rec in recs:
+        print(rec)
+
+
+def cmd_export(tracker, args=()):
+    """Export current metrics as JSON, or stream them as NDJSON."""
+    try:
+        opts = export_stream.parse_export_args(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if opts["format"] == "json":
+        print(json.dumps(tracker.metrics, indent=2))
+        return
+
+    export_stream.export_records(tracker.iter_records(), opts)
+
+
+def cmd_analyze(tracker):
+    """Analyze session and provide optimization recommendations."""
+    metrics = tracker.metrics
+    m = metrics.get("metrics", {})
+
+    duration = tracker.duration_minutes()
+    score = metrics.get("health_score", tracker.health_score())
+
+    # Categorize files by recency (we can't actually know recency, so use order)
+    files_read = m.get("files_read", [])
+    files_written = m.get("files_written", [])
+
+    # Recent files (last 5 read or any written)
+    recent_files = set(files_read[-5:] + files_written)
+    old_files = [f for f in files_read[:-5] if f not in recent_files]
+
+    print(f"""SESSION OPTIMIZATION ANALYSIS
+==============================
+Health Score: {score}/100
+Duration: {int(duration)}m
+Total Tool Calls: {m.get('total_tool_calls', 0)}
+
+CONTEXT CATEGORIZATION
+----------------------
+MUST PRESERVE (Recent/Active):""")
+
+    for f in list(recent_files)[:5]:
+        print(f"  - {Path(f).name}")
+
+    print(f"""
+SAFE TO PRUNE (Older Reads):""")
+    for f in old_files[:5]:
+        print(f"  - {Path(f).name}")
+    if len(old_files) > 5:
+        print(f"  ... and {len(old_files) - 5} more")
+
+    redundant = top_redundant_files(m)
+    if redundant:
+        print(f"""
+REDUNDANT READS (Unchanged Re-reads)
+------------------------------------
+Total: {m.get('redundant_reads', 0)} re-reads, {m.get('wasted_tokens', 0)} tokens wasted""")
+        for path, entry in redundant:
+            print(f"  - {Path(path).name}: read {entry['reads']}x, "
+                  f"{entry['redundant_reads']}x unchanged ({entry['wasted_tokens']} tokens)")
+
+    events = metrics.get("compaction_events", [])
+    if events:
+        summary = export_stream.summarize_compactions(events)
+        print(f"""
+COMPACTION EFFECTIVENESS
+------------------------""")
+        for e in events[-5:]:
+            if e.get("tokens_after") is None:
+                print(f"  {e['at'][11:16]} {e['strategy']}: {e['tokens_before']} tokens before "
+                      f"(measuring, {e['calls_observed']}/{COMPACTION_OBSERVE_CALLS} calls)")
+            else:
+                if not e.get("measured"):
+                    retained = "estimated, not comparable"
+                elif e.get("retained_ratio") is not None:
+                    retained = f"kept {e['retained_ratio']:.0%}"
+                else:
+                    retained = "kept ?"
+                print(f"  {e['at'][11:16]} {e['strategy']}: {e['tokens_before']} -> {e['tokens_after']} tokens "
+                      f"({retained}), working set "
+                      f"{e['working_set_before']} -> {e['working_set_after']} files")
+        if summary["compactions_measured"]:
+            avg = summary["tokens_reclaimed"] / summary["compactions_measured"]
+            kept = 1 - summary["tokens_reclaimed"] / summary["compaction_tokens_before"]
+            print(f"  Avg reclaimed: {avg:.0f} tokens/compaction, {kept:.0%} of context kept")
+
+    print(f"""
+RECOMMENDED ACTIONS
+-------------------""")
+
+    if score < 70 and m.get("checkpoints_created", 0) == 0:
+        print("1. Create checkpoint first:")
+        print("   /session-checkpoint before-optimize")
+        print()
+
+    if score < 60:
+        # Build compact suggestion
+        preserve_patterns = []
+        for f in list(recent_files)[:3]:
+            preserve_patterns.append(Path(f).name)
+
+        print("2. Run focused compaction:")
+        print(f"   /compact Preserve: {', '.join(preserve_patterns)}")
+
+    if score < 40:
+        print()
+        print("3. CRITICAL: Consider session restart after saving checkpoint")
+
+
+# === Main ===
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        sys.exit(1)
+
+    command = argv[0]
+    tracker = SessionTracker()
+
+    if command == "init":
+        stdin_data = sys.stdin.read() if not sys.stdin.isatty() else None
+        session_id = parse_details(stdin_data).get("session_id")
+        print(f"Session initialized: {tracker.init_session(session_id)}")
+    elif command == "record":
+        stdin_data = sys.stdin.read() if not sys.stdin.isatty() else None
+        details = parse_details(stdin_data)
+        tool_name = argv[1] if len(argv) > 1 else details.get("tool_name", "Unknown")
+        tracker.record(tool_name, details)
+    elif command == "status":
+        cmd_status(tracker)
+    elif command == "export":
+        cmd_export(tracker, argv[1:])
+    elif command == "analyze":
+        cmd_analyze(tracker)
+    elif command == "checkpoint":
+        tracker.increment_checkpoint()
+    elif command == "compaction":
+        stdin_data = sys.stdin.read() if not sys.stdin.isatty() else None
+        tracker.record_compaction(parse_details(stdin_data))
+    else:
+        print(f"Unknown command: {command}")
+        print(__doc__)
+        sys.exit(1)
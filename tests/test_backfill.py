@@ -0,0 +1,110 @@
+"""Checks for replaying historical transcripts (README "Backfill From Past Sessions")."""
+
+import json
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from session_memory import analytics, tracker  # noqa: E402
+
+# Recent enough to stay inside the retention window
+NOW = datetime.now().isoformat()
+
+
+def tool_use(session_id, name, tool_input, usage=None, **extra):
+    message = {"content": [{"type": "tool_use", "name": name, "input": tool_input}]}
+    if usage is not None:
+        message["usage"] = {"input_tokens": usage}
+    return {"timestamp": NOW, "sessionId": session_id, "message": message, **extra}
+
+
+def compact_boundary(session_id, pre_tokens):
+    return {
+        "timestamp": NOW,
+        "sessionId": session_id,
+        "subtype": "compact_boundary",
+        "compactMetadata": {"trigger": "auto", "preTokens": pre_tokens},
+    }
+
+
+class TranscriptTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, entries):
+        path = self.dir / name
+        with open(path, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        return path
+
+
+class ReplayTest(TranscriptTestCase):
+    def test_bounded_replay_matches_per_event_recording(self):
+        """Sketches held open across a replay give the same result as recording each event."""
+        files = tracker.BOUNDED_FILE_THRESHOLD + 500
+        entries = [tool_use("aaaa1111-x", "Read", {"file_path": f"/gone/f{i}.py"}, usage=1_000 + i)
+                   for i in range(files)]
+        entries.insert(files - 200, compact_boundary("aaaa1111-x", 150_000))
+        summary = analytics.replay_transcript(str(self.write("s.jsonl", entries)))
+
+        metrics = tracker.get_default_metrics()
+        for i in range(files):
+            if i == files - 200:
+                tracker.record_compaction(metrics, {"trigger": "auto"}, context_usage=150_000)
+            tracker.record_tool(metrics, "Read", {"tool_input": {"file_path": f"/gone/f{i}.py"}},
+                                hash_content=False, context_usage=1_000 + i)
+
+        self.assertEqual(metrics["metrics"]["tracking_mode"], "bounded")
+        self.assertEqual(summary["total_tool_calls"], files)
+        self.assertEqual(summary["files_read_count"], tracker.count_files(metrics["metrics"], "read"))
+        self.assertEqual(summary["compactions_measured"], 1)
+        self.assertEqual(summary["tokens_reclaimed"], metrics["compaction_events"][0]["tokens_reclaimed"])
+
+    def test_malformed_inputs_are_skipped(self):
+        path = self.write("s.jsonl", [
+            tool_use("bbbb2222-x", "Read", {"file_path": "/gone/a.py"}),
+            tool_use("bbbb2222-x", "Read", {"file_path": 7}),
+            tool_use("bbbb2222-x", "Edit", ["not", "a", "dict"]),
+        ])
+        summary = analytics.replay_transcript(str(path))
+        self.assertEqual(summary["total_tool_calls"], 1)
+
+
+class BackfillTest(TranscriptTestCase):
+    def test_sidechain_transcripts_do_not_create_rows(self):
+        self.write("main.jsonl", [tool_use("dddd4444-x", "Bash", {"command": "ls"}) for _ in range(40)])
+        self.write("agent-1.jsonl", [tool_use("dddd4444-x", "Bash", {"command": "ls"}, isSidechain=True)
+                                     for _ in range(3)])
+        store = analytics.AnalyticsStore(self.dir / "plugin")
+        store.backfill([self.dir], workers=1)
+        rows = [s for s in store.data["sessions"] if s["session_id"] == "dddd4444"]
+        self.assertEqual([s["total_tool_calls"] for s in rows], [40])
+
+    def test_duplicate_sessions_keep_the_fullest_summary_in_any_order(self):
+        def summary(calls):
+            return {"session_id": "eeee5555", "ended_at": NOW, "total_tool_calls": calls}
+
+        orders = (
+            [[summary(40), summary(3)]],
+            [[summary(3), summary(40)]],
+            [[summary(40)], [summary(3)]],
+            [[summary(3)], [summary(40)]],
+        )
+        for n, batches in enumerate(orders):
+            store = analytics.AnalyticsStore(self.dir / f"plugin-{n}")
+            for batch in batches:
+                store.record_many(batch)
+            self.assertEqual([s["total_tool_calls"] for s in store.data["sessions"]], [40], batches)
+
+
+if __name__ == "__main__":
+    unittest.main()
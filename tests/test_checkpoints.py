@@ -0,0 +1,150 @@
+"""Checks for the incremental checkpoint search index (README "`/session-restore [name]`")."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from session_memory import checkpoints  # noqa: E402
+from session_memory.checkpoints import CheckpointStore, term_shard  # noqa: E402
+
+
+def checkpoint(task, summary="", files=()):
+    return {"current_task": task, "summary": summary, "active_files": list(files)}
+
+
+class IndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.store = CheckpointStore(self.root / "plugin")
+        self.store.save("auth", checkpoint("fix login token refresh", "oauth token expiry", ["src/auth/token.py"]))
+        self.store.save("billing", checkpoint("invoice rounding", "currency rounding in invoices"))
+        self.store.save("docs", checkpoint("write readme", "token budget section"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def names(self, query, store=None):
+        return [r["name"] for r in (store or self.store).search(query)]
+
+    def rebuilt_names(self, query):
+        """Search a copy of the checkpoints indexed from scratch."""
+        copy = self.root / f"rebuilt-{len(os.listdir(self.root))}"
+        shutil.copytree(self.store.checkpoint_dir, copy / "data" / "checkpoints")
+        return self.names(query, CheckpointStore(copy))
+
+    def assertSearch(self, query, expected):
+        """Incremental, reopened and rebuilt indexes must all agree."""
+        self.assertEqual(self.names(query), expected)
+        self.assertEqual(self.names(query, CheckpointStore(self.root / "plugin")), expected)
+        self.assertEqual(self.rebuilt_names(query), expected)
+
+    def log_lines(self, path):
+        return path.read_text().splitlines()
+
+
+class IncrementalIndexTest(IndexTestCase):
+    def test_save_ranks_and_excludes(self):
+        self.assertSearch("token", ["auth", "docs"])
+        self.assertSearch("rounding invoice", ["billing"])
+        self.assertSearch("nothing matches", [])
+
+    def test_resave_with_changed_shards(self):
+        old_shards = {term_shard(t) for t in ("login", "oauth", "expiry")}
+        self.store.save("auth", checkpoint("migrate database schema", "postgres upgrade"))
+        new_shards = set(self.store._get_index()["docs"]["auth"]["shards"])
+        self.assertTrue(old_shards - new_shards)
+
+        self.assertSearch("login oauth", [])
+        self.assertSearch("token", ["docs"])
+        self.assertSearch("postgres schema", ["auth"])
+        for shard in old_shards - new_shards:
+            last = [json.loads(line) for line in self.log_lines(self.store._shard_path(shard))][-1]
+            self.assertEqual(last, ["auth", None])
+
+    def test_resave_appends_instead_of_rewriting(self):
+        docs_log = self.store.index_dir / "docs.log"
+        before = self.log_lines(docs_log)
+        self.store.save("billing", checkpoint("invoice rounding", "half-even rounding"))
+        after = self.log_lines(docs_log)
+        self.assertEqual(after[:len(before)], before)
+        self.assertEqual(len(after), len(before) + 1)
+
+    def test_delete(self):
+        self.assertTrue(self.store.delete("auth"))
+        self.assertFalse(self.store.delete("auth"))
+        self.assertSearch("token", ["docs"])
+        self.assertSearch("oauth", [])
+
+    def test_externally_written_files(self):
+        # Checkpoints written by hooks or the slash command bypass the store
+        path = self.store.path("hooked")
+        path.write_text(json.dumps(checkpoint("session end", "token usage report")))
+        self.store.path("billing").write_text(json.dumps(checkpoint("refund flow", "stripe refunds")))
+        st = self.store.path("billing").stat()
+        os.utime(self.store.path("billing"), ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.store.path("docs").unlink()
+
+        self.assertEqual(set(self.names("token")), {"auth", "hooked"})
+        self.assertSearch("invoice", [])
+        self.assertSearch("refunds", ["billing"])
+        self.assertSearch("readme", [])
+
+    def test_other_process_writes_are_picked_up(self):
+        other = CheckpointStore(self.root / "plugin")
+        self.assertEqual(self.names("token", other), ["auth", "docs"])
+        self.store.save("gateway", checkpoint("token gateway", "token token rotation"))
+        self.store.delete("auth")
+        self.assertEqual(self.names("token", other), ["gateway", "docs"])
+
+    def test_torn_final_line_is_ignored(self):
+        with open(self.store.index_dir / "docs.log", "a") as f:
+            f.write('{"name": "half')
+        self.assertSearch("token", ["auth", "docs"])
+        self.store.save("gateway", checkpoint("token gateway", "token token rotation"))
+        self.assertSearch("token", ["gateway", "auth", "docs"])
+
+
+class IndexMaintenanceTest(IndexTestCase):
+    def test_log_compaction(self):
+        for i in range(120):
+            self.store.save("billing", checkpoint("invoice rounding", f"revision {i} rounding"))
+        docs_log = self.store.index_dir / "docs.log"
+        shard_log = self.store._shard_path(term_shard("rounding"))
+        self.assertGreater(len(self.log_lines(docs_log)), 120)
+        self.assertGreater(len(self.log_lines(shard_log)), 120)
+
+        reopened = CheckpointStore(self.root / "plugin")
+        self.assertEqual(self.names("rounding", reopened), ["billing"])
+        self.assertEqual(len(self.log_lines(docs_log)), 1 + 3)
+        self.assertLessEqual(len(self.log_lines(shard_log)), 3)
+        self.assertSearch("token", ["auth", "docs"])
+        self.assertSearch("119", ["billing"])
+        self.assertSearch("118", [])
+
+    def test_outdated_version_is_rebuilt(self):
+        index_dir = self.store.index_dir
+        (index_dir / "docs.log").write_text(json.dumps({"version": checkpoints.INDEX_VERSION - 1}) + "\n")
+        (index_dir / "docs.json").write_text("{}")
+        (index_dir / "postings-999.log").write_text('["ghost", {"token": 9}]\n')
+
+        self.assertSearch("token", ["auth", "docs"])
+        self.assertFalse((index_dir / "docs.json").exists())
+        self.assertFalse((index_dir / "postings-999.log").exists())
+        header = json.loads(self.log_lines(index_dir / "docs.log")[0])
+        self.assertEqual(header, {"version": checkpoints.INDEX_VERSION})
+
+    def test_missing_index_is_rebuilt(self):
+        shutil.rmtree(self.store.index_dir)
+        self.assertSearch("token", ["auth", "docs"])
+        self.assertTrue((self.store.index_dir / "docs.log").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Accuracy checks for bounded tracking (README "Bounded Tracking")."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from session_memory import tracker  # noqa: E402
+from session_memory.sketches import BloomFilter, HyperLogLog  # noqa: E402
+
+# Documented HyperLogLog standard error is ~1.6%; allow three standard errors
+HLL_TOLERANCE = 3 * 0.016
+
+
+def relative_error(estimate, actual):
+    return abs(estimate - actual) / actual
+
+
+class HyperLogLogTest(unittest.TestCase):
+    def test_error_within_documented_bound(self):
+        for n in (5_000, 50_000, 200_000):
+            hll = HyperLogLog()
+            for i in range(n):
+                hll.add(f"/repo/src/module_{i}.py")
+            self.assertLess(relative_error(hll.count(), n), HLL_TOLERANCE, n)
+
+    def test_repeats_do_not_inflate_count(self):
+        hll = HyperLogLog()
+        for _ in range(3):
+            for i in range(10_000):
+                hll.add(f"file_{i}")
+        self.assertLess(relative_error(hll.count(), 10_000), HLL_TOLERANCE)
+
+
+class BloomFilterTest(unittest.TestCase):
+    def test_false_positive_rate_within_documented_bound(self):
+        bloom = BloomFilter()
+        for i in range(60_000):
+            bloom.add(f"read:/repo/file_{i}")
+        false_positives = sum(f"read:/other/file_{i}" in bloom for i in range(20_000))
+        self.assertLess(false_positives / 20_000, 0.02)
+
+
+class BoundedTrackingTest(unittest.TestCase):
+    def test_distinct_reads_counted_despite_filter_saturation(self):
+        """Reads, writes and compactions all fill filters; counts must stay accurate."""
+        metrics = tracker.get_default_metrics()
+        m = metrics["metrics"]
+        total = 100_050
+        sk = None
+        for i in range(total):
+            m["total_tool_calls"] += 1
+            path = f"/repo/pkg_{i % 97}/file_{i}.py"
+            tracker.track_file(m, "read", path, sk)
+            if i % 3 == 0:
+                tracker.track_file(m, "written", path, sk)
+            if sk is None and tracker.count_files(m, "read") > tracker.BOUNDED_FILE_THRESHOLD:
+                tracker.switch_to_bounded(m)
+                sk = tracker.open_sketches(m)
+            if sk is not None and i % 10_000 == 0:
+                tracker.store_sketches(m, sk)
+                tracker.record_compaction(metrics, {"trigger": "auto"})
+                sk = tracker.open_sketches(m)
+        tracker.store_sketches(m, sk)
+
+        self.assertEqual(m["tracking_mode"], "bounded")
+        self.assertLess(relative_error(tracker.count_files(m, "read"), total), HLL_TOLERANCE)
+        self.assertLess(relative_error(tracker.count_files(m, "written"), (total + 2) // 3), HLL_TOLERANCE)
+        self.assertLessEqual(len(m["files_read"]), tracker.TOP_K_FILES)
+
+    def test_batch_matches_one_call_at_a_time(self):
+        """record_tools keeps sketches open across a batch, including the switch to bounded mode."""
+        events = [
+            ("Edit" if i % 4 == 0 else "Read", {"tool_input": {"file_path": f"/repo/file_{i % 2_400}.py"}})
+            for i in range(3_000)
+        ]
+        batched = tracker.get_default_metrics()
+        single = tracker.get_default_metrics()
+        for metrics, record in ((batched, tracker.record_tools), (single, None)):
+            for chunk in (events[:2_800], events[2_800:]):
+                if record:
+                    record(metrics, chunk, hash_content=False)
+                else:
+                    for tool_name, details in chunk:
+                        tracker.record_tool(metrics, tool_name, details, hash_content=False)
+                tracker.record_compaction(metrics, {"trigger": "auto"})
+
+        self.assertEqual(batched["metrics"]["tracking_mode"], "bounded")
+        self.assertEqual(batched["metrics"], single["metrics"])
+        self.assertEqual(
+            [{k: v for k, v in e.items() if k != "at"} for e in batched["compaction_events"]],
+            [{k: v for k, v in e.items() if k != "at"} for e in single["compaction_events"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Round-trip and corruption checks for the binary snapshot format (README "Binary Snapshots")."""
+
+import json
+import struct
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from session_memory import snapshot, tracker  # noqa: E402
+from session_memory.snapshot import SnapshotError  # noqa: E402
+
+
+def sample_metrics():
+    metrics = tracker.get_default_metrics()
+    metrics["started_at"] = "2026-10-18T09:30:00.123456"
+    metrics["last_activity"] = "2026-10-18T11:45:10"
+    metrics["health_score"] = 72
+    for i in range(30):
+        tracker.record_tool(metrics, "Read", {"tool_input": {"file_path": f"/repo/src/mod_{i % 20}.py"}},
+                            hash_content=False)
+        tracker.record_tool(metrics, "Edit", {"tool_input": {"file_path": f"/repo/src/ü_{i % 7}.py"}},
+                            hash_content=False)
+    tracker.record_tool(metrics, "Bash", {}, hash_content=False)
+    tracker.record_compaction(metrics, {"trigger": "manual"}, at=datetime(2026, 10, 18, 10), context_usage=90_000)
+    metrics["metrics"]["checkpoints_created"] = 2
+    return metrics
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.path = self.dir / "metrics.bin"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+class RoundTripTest(SnapshotTestCase):
+    def test_round_trip_matches_json_document(self):
+        metrics = sample_metrics()
+        snapshot.dump(metrics, self.path)
+        loaded = snapshot.load(self.path)
+        self.assertEqual(loaded, metrics)
+        self.assertEqual(list(loaded["metrics"]), list(metrics["metrics"]))
+        self.assertEqual(json.loads(json.dumps(loaded)), json.loads(json.dumps(metrics)))
+
+    def test_bounded_state_round_trips(self):
+        metrics = sample_metrics()
+        tracker.switch_to_bounded(metrics["metrics"])
+        snapshot.dump(metrics, self.path)
+        self.assertEqual(snapshot.load(self.path), metrics)
+
+    def test_integer_timestamps_are_exposed(self):
+        metrics = sample_metrics()
+        snapshot.dump(metrics, self.path)
+        loaded = snapshot.load(self.path)
+        for field in ("started_at", "last_activity"):
+            epoch_us = loaded.epoch_us[loaded[field]]
+            self.assertIsInstance(epoch_us, int)
+            self.assertEqual(snapshot.to_datetime(epoch_us), datetime.fromisoformat(metrics[field]))
+
+    def test_missing_started_at(self):
+        metrics = sample_metrics()
+        del metrics["started_at"]
+        snapshot.dump(metrics, self.path)
+        loaded = snapshot.load(self.path)
+        self.assertIsNone(loaded["started_at"])
+        self.assertNotIn(None, loaded.epoch_us)
+        missing = self.dir / ".session_start"
+        self.assertEqual(tracker.get_duration_minutes(loaded, session_start_file=missing), 0)
+
+    def test_empty_document(self):
+        snapshot.dump({}, self.path)
+        loaded = snapshot.load(self.path)
+        self.assertEqual(loaded["session_id"], "unknown")
+        self.assertEqual(loaded["metrics"]["files_read"], [])
+
+
+class CorruptionTest(SnapshotTestCase):
+    def setUp(self):
+        super().setUp()
+        snapshot.dump(sample_metrics(), self.path)
+        self.data = self.path.read_bytes()
+
+    def load_bytes(self, data):
+        self.path.write_bytes(data)
+        return snapshot.load(self.path)
+
+    def test_every_truncation_is_rejected(self):
+        for size in range(len(self.data)):
+            with self.subTest(size=size), self.assertRaises(SnapshotError):
+                self.load_bytes(self.data[:size])
+
+    def test_bad_magic(self):
+        with self.assertRaisesRegex(SnapshotError, "Not a metrics snapshot"):
+            self.load_bytes(b"JSON" + self.data[4:])
+
+    def test_unknown_version(self):
+        data = self.data[:4] + struct.pack("<H", snapshot.VERSION + 1) + self.data[6:]
+        with self.assertRaisesRegex(SnapshotError, "Unsupported snapshot version"):
+            self.load_bytes(data)
+
+    def test_every_single_byte_corruption_is_rejected_or_parsed(self):
+        """Flipping any byte either fails with SnapshotError or still yields a document."""
+        for pos in range(len(self.data)):
+            data = bytearray(self.data)
+            data[pos] ^= 0xFF
+            with self.subTest(pos=pos):
+                try:
+                    loaded = self.load_bytes(bytes(data))
+                except SnapshotError:
+                    continue
+                self.assertIsInstance(loaded["metrics"], dict)
+
+
+class TrackerFallbackTest(SnapshotTestCase):
+    def test_corrupt_snapshot_falls_back_to_json(self):
+        metrics = sample_metrics()
+        (self.dir / "data").mkdir()
+        (self.dir / "data" / "metrics.bin").write_bytes(b"SMOS\x01\x00\x00\x00\x05")
+        (self.dir / "data" / "metrics.json").write_text(json.dumps(metrics))
+        self.assertEqual(tracker.SessionTracker(self.dir).metrics, metrics)
+
+    def test_corrupt_snapshot_without_json_gives_defaults(self):
+        (self.dir / "data").mkdir()
+        (self.dir / "data" / "metrics.bin").write_bytes(b"garbage")
+        loaded = tracker.SessionTracker(self.dir).metrics
+        self.assertEqual(loaded["metrics"]["total_tool_calls"], 0)
+
+    def test_binary_format_round_trips_through_tracker(self):
+        session = tracker.SessionTracker(self.dir, snapshot_format="binary")
+        session.init_session("abcd1234")
+        session.record_many([("Read", {"tool_input": {"file_path": "/repo/a.py"}})], hash_content=False)
+        self.assertTrue((self.dir / "data" / "metrics.bin").exists())
+        self.assertFalse((self.dir / "data" / "metrics.json").exists())
+        reopened = tracker.SessionTracker(self.dir, snapshot_format="binary").metrics
+        self.assertIsInstance(reopened, snapshot.Snapshot)
+        self.assertEqual(reopened, session.metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
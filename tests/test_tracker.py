@@ -0,0 +1,93 @@
+"""Checks for live session tracking (README "Redundant Reads", "In-Process API")."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from session_memory import analytics, tracker  # noqa: E402
+
+
+class TrackerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.file = self.root / "notes.txt"
+        self.file.write_text("unchanged content\n" * 200)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, metrics, **tool_input):
+        tracker.record_tool(metrics, "Read", {"tool_input": {"file_path": str(self.file), **tool_input}})
+
+
+class RedundantReadTest(TrackerTestCase):
+    def test_unchanged_rereads_are_redundant(self):
+        metrics = tracker.get_default_metrics()
+        for _ in range(3):
+            self.read(metrics)
+        self.assertEqual(metrics["metrics"]["redundant_reads"], 2)
+
+    def test_other_range_or_changed_content_is_not_redundant(self):
+        metrics = tracker.get_default_metrics()
+        self.read(metrics)
+        self.read(metrics, offset=10, limit=20)
+        self.file.write_text("edited\n")
+        self.read(metrics, offset=10, limit=20)
+        self.assertEqual(metrics["metrics"].get("redundant_reads", 0), 0)
+
+    def test_first_read_after_compaction_is_not_redundant(self):
+        metrics = tracker.get_default_metrics()
+        for _ in range(3):
+            self.read(metrics)
+        tracker.record_compaction(metrics, {"trigger": "manual"}, context_usage=50_000)
+        for _ in range(5):
+            self.read(metrics)
+
+        m = metrics["metrics"]
+        entry = m["read_fingerprints"][str(self.file)]
+        self.assertEqual(m["redundant_reads"], 2 + 4)
+        self.assertEqual(entry["reads"], 8)
+        self.assertEqual(entry["redundant_reads"], 6)
+
+
+class ConcurrentWriteTest(TrackerTestCase):
+    def test_unsaved_change_survives_external_write(self):
+        session = tracker.SessionTracker(self.root)
+        session.init_session("abcd1234")
+        session.increment_checkpoint(save=False)
+        # A hook process records a tool call in the meantime
+        tracker.SessionTracker(self.root).record("Bash")
+        session.record("Bash")
+        reopened = tracker.SessionTracker(self.root).metrics["metrics"]
+        self.assertEqual(reopened["checkpoints_created"], 1)
+
+    def test_save_writes_the_document_as_held(self):
+        session = tracker.SessionTracker(self.root)
+        session.init_session("abcd1234")
+        session.metrics["metrics"]["context_tokens"] = 1234
+        tracker.SessionTracker(self.root).record("Bash")
+        session.save()
+        self.assertEqual(tracker.SessionTracker(self.root).metrics["metrics"]["context_tokens"], 1234)
+
+    def test_external_writes_are_picked_up_when_nothing_is_pending(self):
+        session = tracker.SessionTracker(self.root)
+        session.init_session("abcd1234")
+        tracker.SessionTracker(self.root).record_many([("Bash", {})] * 3)
+        session.record("Bash")
+        self.assertEqual(session.metrics["metrics"]["total_tool_calls"], 4)
+
+    def test_analytics_save_keeps_in_memory_data(self):
+        store = analytics.AnalyticsStore(self.root)
+        store.data["sessions"].append({"session_id": "mine"})
+        analytics.AnalyticsStore(self.root).save()
+        store.save()
+        ids = [s["session_id"] for s in analytics.AnalyticsStore(self.root).data["sessions"]]
+        self.assertEqual(ids, ["mine"])
+
+
+if __name__ == "__main__":
+    unittest.main()